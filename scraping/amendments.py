@@ -0,0 +1,99 @@
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+COVER_PAGE_FILE = 'primary_doc.xml'
+COVER_PAGE_FIELDS = ['submissionType', 'reportCalendarOrQuarter', 'isAmendment', 'amendmentNo', 'amendmentType']
+
+RESTATEMENT = 'RESTATEMENT'
+NEW_HOLDINGS = 'NEW HOLDINGS'
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def read_cover_page(path):
+    """Cover page fields of a filing's primary_doc.xml, '' when absent"""
+    fields = dict.fromkeys(COVER_PAGE_FIELDS, '')
+    for _, elem in ET.iterparse(path):
+        name = _local_name(elem.tag)
+        if name in fields and elem.text:
+            fields[name] = elem.text.strip()
+        elem.clear()
+    return fields
+
+
+def report_period(value):
+    """A cover page's reportCalendarOrQuarter (MM-DD-YYYY) as YYYY-MM-DD, None when unreadable"""
+    period = pd.to_datetime(str(value or '').strip(), format='%m-%d-%Y', errors='coerce')
+    return None if pd.isna(period) else period.strftime('%Y-%m-%d')
+
+
+def amendment_type(value):
+    """Normalize an amendment type to RESTATEMENT, NEW HOLDINGS or ''"""
+    value = ' '.join(str(value or '').upper().replace('_', ' ').split())
+    if value.startswith('RESTATE'):
+        return RESTATEMENT
+    if value.startswith('NEW'):
+        return NEW_HOLDINGS
+    return ''
+
+
+def canonical_filings(filings):
+    """Filing Numbers that make up the canonical holdings of each period
+
+    filings has one row per filing with Filing Number, Form, Amendment
+    Type, Filing Date and Report Date. Filings of a period are applied in
+    filing order: an original 13F-HR or a RESTATEMENT amendment replaces
+    everything before it, and a NEW HOLDINGS amendment adds to it. An
+    amendment of unknown type is treated as a restatement, which can drop
+    positions but never counts one twice. Filings without a report date
+    cannot be matched to a period and are all kept.
+    """
+    filings = filings.assign(
+        _filed=filings['Filing Date'].astype(str),
+        _number=filings['Filing Number'].astype(str),
+        _period=filings['Report Date'].astype(object).where(filings['Report Date'].notna(), None),
+    ).sort_values(['_filed', '_number'])
+
+    keep = set(filings.loc[filings['_period'].isna(), 'Filing Number'])
+    unknown = 0
+    for _, group in filings.dropna(subset=['_period']).groupby('_period', sort=False):
+        kept = []
+        for number, form, kind in zip(group['Filing Number'], group['Form'].astype(str), group['Amendment Type']):
+            if not form.upper().endswith('/A'):
+                kept = [number]
+            elif amendment_type(kind) == NEW_HOLDINGS:
+                kept.append(number)
+            else:
+                unknown += amendment_type(kind) == ''
+                kept = [number]
+        keep.update(kept)
+    if unknown:
+        print(f"{unknown} amendments have no amendment type; treated as restatements")
+    return keep
+
+
+def reconcile_amendments(df):
+    """Reduce holdings to one canonical set per period of report
+
+    Originals and their 13F-HR/A amendments are all reported as separate
+    filings; see canonical_filings for how they are combined. Frames
+    without a Form column are returned unchanged.
+    """
+    if df.empty or 'Form' not in df.columns:
+        return df
+    if 'Amendment Type' not in df.columns:
+        df['Amendment Type'] = ''
+
+    filings = df.drop_duplicates('Filing Number')[
+        ['Filing Number', 'Form', 'Amendment Type', 'Filing Date', 'Report Date']
+    ]
+    if not filings['Form'].astype(str).str.upper().str.endswith('/A').any():
+        return df
+
+    keep = canonical_filings(filings)
+    reconciled = df[df['Filing Number'].isin(keep)].reset_index(drop=True)
+    print(f"Reconciled {len(filings)} filings into {len(keep)}, dropping {len(df) - len(reconciled)} superseded rows")
+    return reconciled
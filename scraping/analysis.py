@@ -3,28 +3,57 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import hashlib
+import json
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
+import pyarrow as pa
+from concurrent.futures import ProcessPoolExecutor
+from plotly.offline import get_plotlyjs
+from holdings_store import parse_dates, read_holdings
+from result_cache import ResultCache, memoized
+from ownership_index import OwnershipIndex
+from security_master import SecurityMaster, security_labels
+from run_report import RunMetrics, default_metrics
+
+PLOTLY_ASSET = 'plotly.min.js'
+SHARED_DATASET_FILE = '.holdings.arrow'
+FINGERPRINTS_FILE = 'report_fingerprints.json'
+# Bump when report contents change so every fund is regenerated once
+REPORT_FORMAT_VERSION = 1
+# Bump when any memoized analysis changes so results cached on disk are recomputed
+ANALYSIS_VERSION = 1
 
 class HedgeFundAnalyzer:
-    def __init__(self, df):
+    def __init__(self, df, cache=None, cache_dir=None, security_master=None):
         self.df = df.copy()
         
-        # Convert accession number to date (format: 0000919574-13-005137)
-        def extract_date_from_accession(acc_num):
-            try:
-                # Extract year from accession number (position 11-13)
-                year = '20' + acc_num.split('-')[1]
-                # Use first day of the quarter for simplicity
-                return f"{year}-01-01"
-            except:
-                return None
-        
-        # Convert accession numbers to dates
-        self.df['Filing Date'] = pd.to_datetime(
-            self.df['Filing Date'].apply(extract_date_from_accession)
-        )
+        # Securities are identified by integer IDs from the security master so that
+        # grouping and merging never hash issuer-name strings
+        self.security_master = security_master
+        if 'Security ID' not in self.df.columns:
+            self.security_master = security_master or SecurityMaster()
+            self.df['Security ID'] = self.security_master.assign(self.df)
+        if self.security_master is not None:
+            self._security_labels = self.security_master.labels()
+        else:
+            self._security_labels = security_labels(self.df)
+        # Per-fund results are memoized here; pass cache_dir to keep them across runs
+        self.cache = cache if cache is not None else ResultCache(disk_dir=cache_dir, version=ANALYSIS_VERSION)
+        self._data_versions = {}
+        self._row_hashes = None
+        self._ownership_index = None
+        
+        # Holdings are keyed by the period they report on. Dates are parsed once per
+        # distinct value (to_datetime caches repeats), not row by row.
+        if 'Report Date' in self.df.columns:
+            self.df['Report Date'] = parse_dates(self.df['Report Date'])
+        else:
+            self.df['Report Date'] = pd.NaT
+        undated = self.df['Report Date'].isna()
+        if undated.any():
+            self.df.loc[undated, 'Report Date'] = self._dates_from_accession_numbers(undated)
         
         # Convert value columns to numeric
         numeric_cols = ['VALUE (x$1000)', 'SHRS OR PRN AMT', 
@@ -32,21 +61,128 @@ class HedgeFundAnalyzer:
                        'VOTING AUTHORITY NONE']
         for col in numeric_cols:
             self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
+        
+        self._build_index()
+    
+    def _build_index(self):
+        """Sort holdings by (fund, period) and record each group's row range
+        
+        After sorting every fund and every fund-period occupies a contiguous
+        block of rows, so slices are positional iloc lookups instead of
+        full-table comparisons.
+        """
+        self.df = self.df.sort_values(['Fund Name', 'Report Date'], kind='stable').reset_index(drop=True)
+        
+        def ranges(groups):
+            return {key: (positions[0], positions[-1] + 1) for key, positions in groups.indices.items()}
+        
+        self._fund_ranges = ranges(self.df.groupby('Fund Name', observed=True, sort=False))
+        self._period_ranges = ranges(self.df.groupby(['Fund Name', 'Report Date'], observed=True, sort=False))
+        self._fund_periods = {}
+        for fund_name, date in self._period_ranges:
+            self._fund_periods.setdefault(fund_name, []).append(date)
+        for dates in self._fund_periods.values():
+            dates.sort()
+    
+    def funds(self):
+        """Fund names present in the holdings"""
+        return list(self._fund_ranges)
+    
+    def fund_periods(self, fund_name):
+        """Sorted report dates filed by a fund"""
+        return self._fund_periods.get(fund_name, [])
+    
+    def fund_slice(self, fund_name):
+        """All holdings of one fund"""
+        start, stop = self._fund_ranges.get(fund_name, (0, 0))
+        return self.df.iloc[start:stop]
+    
+    def period_slice(self, fund_name, date=None):
+        """Holdings of one fund for a report date (default: its latest)"""
+        if date is None:
+            periods = self.fund_periods(fund_name)
+            if not periods:
+                return self.df.iloc[0:0]
+            date = periods[-1]
+        start, stop = self._period_ranges.get((fund_name, pd.Timestamp(date)), (0, 0))
+        return self.df.iloc[start:stop]
+    
+    def _dates_from_accession_numbers(self, rows):
+        """Fallback for holdings without a report date, e.g. saved before report dates were scraped
+        
+        Only the filing year is encoded in an accession number
+        (0000919574-13-005137), so every filing in a year maps to January 1st.
+        """
+        print(f"{rows.sum()} holdings have no Report Date; approximating periods from accession numbers")
+        source = 'Filing Number' if 'Filing Number' in self.df.columns else 'Filing Date'
+        years = self.df.loc[rows, source].astype(str).str.extract(r'\d{10}-(\d{2})-\d{6}', expand=False)
+        return pd.to_datetime('20' + years + '-01-01', errors='coerce')
+    
+    def data_version(self, fund_name):
+        """Content hash of a fund's holdings, used to key cached results
+        
+        Rows are hashed once for the whole frame; a fund's version is the
+        digest of its contiguous block of row hashes.
+        """
+        if fund_name not in self._data_versions:
+            if self._row_hashes is None:
+                self._row_hashes = pd.util.hash_pandas_object(self.df, index=False).to_numpy()
+            start, stop = self._fund_ranges.get(fund_name, (0, 0))
+            self._data_versions[fund_name] = hashlib.sha1(self._row_hashes[start:stop].tobytes()).hexdigest()
+        return self._data_versions[fund_name]
+    
+    def fund_fingerprint(self, fund_name):
+        """Fingerprint of a fund's report inputs: its accessions, their row counts and a content checksum"""
+        fund_data = self.fund_slice(fund_name)
+        rows_per_filing = fund_data['Filing Number'].astype(str).value_counts().sort_index() \
+            if 'Filing Number' in fund_data.columns else pd.Series(dtype=int)
+        filings = ','.join(f"{number}:{count}" for number, count in rows_per_filing.items())
+        payload = f"{REPORT_FORMAT_VERSION}|{filings}|{len(fund_data)}|{self.data_version(fund_name)}"
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
     
+    def ownership_index(self):
+        """Cross-fund CUSIP ownership index over the analyzer's holdings, built on first use"""
+        if self._ownership_index is None:
+            self._ownership_index = OwnershipIndex.build(self.df)
+        return self._ownership_index
+    
+    def by_parent(self, parent_names):
+        """Analyzer over holdings combined per parent manager
+
+        parent_names maps a CIK to its parent manager's name (see
+        fund_relationships.load_parent_names); funds without an entry stay
+        on their own. Positions of affiliated filers in the same security
+        and period are summed, so every analysis runs at the parent level.
+        """
+        ciks = self.df['CIK'].astype(str).str.zfill(10) if 'CIK' in self.df.columns else pd.Series('', index=self.df.index)
+        parents = ciks.map(parent_names).fillna(self.df['Fund Name'].astype(str))
+
+        numeric_cols = ['VALUE (x$1000)', 'SHRS OR PRN AMT', 'VOTING AUTHORITY SOLE',
+                        'VOTING AUTHORITY SHARED', 'VOTING AUTHORITY NONE']
+        descriptive_cols = [col for col in ['NAME OF ISSUER', 'TITLE OF CLASS', 'CUSIP', 'SH/PRN', 'PUT/CALL', 'Filing Number']
+                            if col in self.df.columns]
+        grouped = self.df.assign(**{'Fund Name': parents}).groupby(
+            ['Fund Name', 'Report Date', 'Security ID'], observed=True, sort=False
+        )
+        combined = grouped[numeric_cols].sum(min_count=1).join(grouped[descriptive_cols].first()).reset_index()
+        return HedgeFundAnalyzer(combined, cache=self.cache, security_master=self.security_master)
+
+    @memoized('summary')
     def generate_fund_summary(self, fund_name):
         """Generate a summary for a specific fund"""
-        fund_data = self.df[self.df['Fund Name'] == fund_name]
+        fund_data = self.fund_slice(fund_name)
         
         # Get date range
-        date_range = f"{fund_data['Filing Date'].min():%Y-%m-%d} to {fund_data['Filing Date'].max():%Y-%m-%d}"
+        first, last = fund_data['Report Date'].min(), fund_data['Report Date'].max()
+        date_range = f"{first:%Y-%m-%d} to {last:%Y-%m-%d}" if pd.notna(first) else "unknown"
         
         # Calculate key metrics
         total_value = fund_data['VALUE (x$1000)'].sum() * 1000  # Convert back to dollars
-        unique_stocks = fund_data['NAME OF ISSUER'].nunique()
+        unique_stocks = fund_data['Security ID'].nunique()
         avg_position_size = total_value / unique_stocks if unique_stocks > 0 else 0
         
         # Get top holdings
-        latest_filing = fund_data[fund_data['Filing Date'] == fund_data['Filing Date'].max()]
+        latest_filing = self.period_slice(fund_name)
         top_holdings = latest_filing.nlargest(10, 'VALUE (x$1000)')
         
         # Calculate portfolio concentration (top 10 holdings as % of total)
@@ -63,10 +199,11 @@ class HedgeFundAnalyzer:
             'portfolio_concentration': concentration
         }
     
+    @memoized('portfolio_evolution')
     def plot_portfolio_evolution(self, fund_name):
         """Plot the evolution of portfolio value over time"""
-        fund_data = self.df[self.df['Fund Name'] == fund_name]
-        portfolio_values = fund_data.groupby('Filing Date')['VALUE (x$1000)'].sum()
+        fund_data = self.fund_slice(fund_name)
+        portfolio_values = fund_data.groupby('Report Date')['VALUE (x$1000)'].sum()
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(
@@ -77,58 +214,93 @@ class HedgeFundAnalyzer:
         ))
         fig.update_layout(
             title=f'{fund_name} - Portfolio Value Over Time',
-            xaxis_title='Filing Date',
+            xaxis_title='Report Date',
             yaxis_title='Value ($ Millions)',
             hovermode='x'
         )
         return fig
     
+    @memoized('sector_exposure')
     def analyze_sector_exposure(self, fund_name, date=None):
         """Analyze sector exposure for a specific date or latest filing"""
-        fund_data = self.df[self.df['Fund Name'] == fund_name]
-        if date:
-            fund_data = fund_data[fund_data['Filing Date'] == date]
-        else:
-            latest_date = fund_data['Filing Date'].max()
-            fund_data = fund_data[fund_data['Filing Date'] == latest_date]
+        fund_data = self.period_slice(fund_name, date)
         
-        holdings_by_value = fund_data.groupby('NAME OF ISSUER')['VALUE (x$1000)'].sum().sort_values(ascending=False)
+        holdings_by_value = fund_data.groupby('Security ID')['VALUE (x$1000)'].sum().sort_values(ascending=False)
+        holdings_by_value.index = self._security_labels.reindex(holdings_by_value.index).to_numpy()
+        holdings_by_value.index.name = 'NAME OF ISSUER'
         total_value = holdings_by_value.sum()
         holdings_by_percentage = (holdings_by_value / total_value * 100).round(2)
         
         return holdings_by_percentage
     
+    @staticmethod
+    def _turnover_from_matrix(matrix):
+        """Turnover statistics between consecutive columns of a (security x period) value matrix
+        
+        Buys and sells are the summed value increases and decreases (x$1000)
+        across securities; new and exited positions count securities that
+        appear or disappear between periods.
+        """
+        dates = matrix.columns
+        held = matrix.notna().to_numpy(dtype=bool)
+        values = matrix.fillna(0).to_numpy(dtype=float)
+        
+        previous, current = values[:, :-1], values[:, 1:]
+        change = current - previous
+        total_previous = previous.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            turnover = np.where(total_previous > 0, np.abs(change).sum(axis=0) / total_previous, 0)
+        
+        return pd.DataFrame({
+            'date': dates[1:],
+            'turnover': turnover * 100,  # Convert to percentage
+            'buys': np.clip(change, 0, None).sum(axis=0),
+            'sells': np.clip(-change, 0, None).sum(axis=0),
+            'new_positions': (~held[:, :-1] & held[:, 1:]).sum(axis=0),
+            'exited_positions': (held[:, :-1] & ~held[:, 1:]).sum(axis=0)
+        })
+    
+    @memoized('turnover')
     def calculate_turnover(self, fund_name):
-        """Calculate portfolio turnover between filings"""
-        fund_data = self.df[self.df['Fund Name'] == fund_name]
-        dates = sorted(fund_data['Filing Date'].unique())
-        
-        turnovers = []
-        for i in range(len(dates)-1):
-            holdings_t1 = fund_data[fund_data['Filing Date'] == dates[i]]
-            holdings_t2 = fund_data[fund_data['Filing Date'] == dates[i+1]]
-            
-            merged = pd.merge(holdings_t1, holdings_t2, 
-                            on=['NAME OF ISSUER'], 
-                            how='outer', 
-                            suffixes=('_t1', '_t2'))
-            
-            merged = merged.fillna(0)
-            total_t1 = merged['VALUE (x$1000)_t1'].sum()
-            turnover = abs(merged['VALUE (x$1000)_t2'] - merged['VALUE (x$1000)_t1']).sum() / total_t1 if total_t1 > 0 else 0
-            
-            turnovers.append({
-                'date': dates[i+1],
-                'turnover': turnover * 100  # Convert to percentage
-            })
-            
-        return pd.DataFrame(turnovers)
+        """Calculate portfolio turnover between filings
+        
+        The fund's holdings are pivoted once into a security x period value
+        matrix and all periods are compared in a single vectorized pass.
+        """
+        fund_data = self.fund_slice(fund_name)
+        matrix = fund_data.pivot_table(
+            index='Security ID', columns='Report Date', values='VALUE (x$1000)',
+            aggfunc='sum', observed=True
+        )
+        return self._turnover_from_matrix(matrix.sort_index(axis=1))
+    
+    def calculate_turnover_all(self):
+        """Turnover for every fund from one grouped aggregation
+        
+        Each fund is only compared across the periods it actually filed.
+        """
+        values = self.df.groupby(['Fund Name', 'Security ID', 'Report Date'], observed=True)['VALUE (x$1000)'].sum()
+        
+        results = []
+        for fund_name, fund_values in values.groupby(level='Fund Name', observed=True):
+            matrix = fund_values.droplevel('Fund Name').unstack('Report Date').sort_index(axis=1)
+            turnover = self._turnover_from_matrix(matrix)
+            turnover.insert(0, 'Fund Name', fund_name)
+            results.append(turnover)
+        
+        if not results:
+            return pd.DataFrame(columns=['Fund Name', 'date', 'turnover', 'buys', 'sells', 'new_positions', 'exited_positions'])
+        return pd.concat(results, ignore_index=True)
 
-    def generate_html_report(self, fund_name):
-        """Generate an HTML report with all analyses"""
+    def generate_html_report(self, fund_name, turnover=None):
+        """Generate an HTML report with all analyses
+        
+        Pass turnover (e.g. a slice of calculate_turnover_all) to skip recomputing it.
+        """
         summary = self.generate_fund_summary(fund_name)
         portfolio_evolution = self.plot_portfolio_evolution(fund_name)
-        turnover = self.calculate_turnover(fund_name)
+        if turnover is None:
+            turnover = self.calculate_turnover(fund_name)
         sector_exposure = self.analyze_sector_exposure(fund_name)
         
         html = f"""
@@ -145,7 +317,7 @@ class HedgeFundAnalyzer:
         {summary['top_holdings'].to_html()}
         
         <h2>Portfolio Evolution</h2>
-        {portfolio_evolution.to_html()}
+        {portfolio_evolution.to_html(full_html=False, include_plotlyjs='directory')}
         
         <h2>Portfolio Turnover</h2>
         {turnover.to_html()}
@@ -156,37 +328,154 @@ class HedgeFundAnalyzer:
         
         return html
 
-def save_fund_analysis(df, output_dir="filling/analysis"):
-    """Save analysis for all funds"""
-    os.makedirs(output_dir, exist_ok=True)
-    analyzer = HedgeFundAnalyzer(df)
+def write_plotly_asset(output_dir):
+    """Write plotly.js once so every report can link it instead of inlining ~3.5MB"""
+    path = os.path.join(output_dir, PLOTLY_ASSET)
+    if not os.path.exists(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+    return path
+
+def report_paths(output_dir, fund_name):
+    """Paths of a fund's HTML report and standalone portfolio plot"""
+    prefix = os.path.join(output_dir, fund_name.replace(' ', '_'))
+    return f"{prefix}_analysis.html", f"{prefix}_portfolio.html"
+
+def write_fund_report(analyzer, fund_name, output_dir, turnover=None, metrics=None):
+    """Write a fund's HTML report and standalone portfolio plot, timing each step in metrics"""
+    metrics = metrics or default_metrics()
+    report_path, plot_path = report_paths(output_dir, fund_name)
     
-    for fund_name in df['Fund Name'].unique():
-        print(f"Analyzing {fund_name}...")
-        
+    with metrics.timed('report'):
         # Generate report
-        html_report = analyzer.generate_html_report(fund_name)
+        with metrics.timed('report: html'):
+            html_report = analyzer.generate_html_report(fund_name, turnover=turnover)
         
         # Save report with UTF-8 encoding
-        report_path = os.path.join(output_dir, f"{fund_name.replace(' ', '_')}_analysis.html")
         with open(report_path, 'w', encoding='utf-8') as f:
             f.write(html_report)
         
         # Save plots
-        portfolio_evolution = analyzer.plot_portfolio_evolution(fund_name)
-        portfolio_evolution.write_html(
-            os.path.join(output_dir, f"{fund_name.replace(' ', '_')}_portfolio.html")
-        )
-        
-        print(f"Analysis saved to {report_path}")
+        with metrics.timed('report: portfolio plot'):
+            portfolio_evolution = analyzer.plot_portfolio_evolution(fund_name)
+            portfolio_evolution.write_html(plot_path, include_plotlyjs='directory')
+    return report_path
+
+# Worker state for parallel report generation, set up once per process
+_worker_table = None
+_worker_options = None
+
+def _init_report_worker(dataset_path, output_dir, cache_dir):
+    global _worker_table, _worker_options
+    # Memory-mapped and zero-copy: workers share the parent's file pages instead of a pickled DataFrame
+    _worker_table = pa.ipc.open_file(pa.memory_map(dataset_path, 'r')).read_all()
+    _worker_options = (output_dir, cache_dir)
+
+def _report_worker(task):
+    """Write one report in a pool process, returning its path and the section timings to merge"""
+    fund_name, start, stop = task
+    output_dir, cache_dir = _worker_options
+    fund_df = _worker_table.slice(start, stop - start).to_pandas()
+    metrics = RunMetrics()
+    report_path = write_fund_report(HedgeFundAnalyzer(fund_df, cache_dir=cache_dir), fund_name, output_dir, metrics=metrics)
+    return report_path, dict(metrics.sections)
+
+def load_fingerprints(output_dir):
+    path = os.path.join(output_dir, FINGERPRINTS_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable fingerprints file {path}: {e}")
+        return {}
+
+def save_fingerprints(output_dir, fingerprints):
+    path = os.path.join(output_dir, FINGERPRINTS_FILE)
+    with open(f"{path}.part", 'w', encoding='utf-8') as f:
+        json.dump(fingerprints, f, indent=1, sort_keys=True)
+    os.replace(f"{path}.part", path)
+
+def save_fund_analysis(df, output_dir="filling/analysis", cache_dir="filling/analysis/cache", workers=None, force=False):
+    """Save analysis for all funds
+    
+    Only funds whose holdings fingerprint changed since the last run (or
+    whose report files are missing) are regenerated; pass force=True to
+    rewrite everything. Results are cached under cache_dir (None disables
+    the on-disk tier; delete it to clear the cache). With more than one
+    worker, reports are written by a process pool that reads the holdings
+    from a memory-mapped Arrow file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    write_plotly_asset(output_dir)
+    analyzer = HedgeFundAnalyzer(df, cache_dir=cache_dir)
+    pruned = analyzer.cache.prune()
+    if pruned:
+        print(f"Pruned {pruned} stale cached results from {cache_dir}")
+    
+    fingerprints = load_fingerprints(output_dir)
+    current = {fund_name: analyzer.fund_fingerprint(fund_name) for fund_name in analyzer.funds()}
+    funds = [
+        fund_name for fund_name, fingerprint in current.items()
+        if force or fingerprints.get(fund_name) != fingerprint
+        or not all(os.path.exists(path) for path in report_paths(output_dir, fund_name))
+    ]
+    skipped = len(current) - len(funds)
+    workers = min(workers or os.cpu_count() or 1, len(funds))
+    
+    written = []
+    try:
+        if workers <= 1:
+            # Turnover for every fund in one pass rather than once per report
+            with default_metrics().timed('turnover: all funds'):
+                all_turnover = analyzer.calculate_turnover_all() if funds else pd.DataFrame(columns=['Fund Name'])
+            turnover_by_fund = {fund: group.drop(columns='Fund Name').reset_index(drop=True)
+                                for fund, group in all_turnover.groupby('Fund Name', observed=True)}
+            
+            for fund_name in funds:
+                print(f"Analyzing {fund_name}...")
+                report_path = write_fund_report(analyzer, fund_name, output_dir, turnover_by_fund.get(fund_name))
+                written.append(fund_name)
+                print(f"Analysis saved to {report_path}")
+            
+            print(f"Result cache: {analyzer.cache.summary()}")
+        else:
+            # The analyzer keeps rows sorted by fund, so each task is a contiguous row range
+            dataset_path = os.path.join(output_dir, SHARED_DATASET_FILE)
+            table = pa.Table.from_pandas(analyzer.df, preserve_index=False)
+            with pa.OSFile(dataset_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            tasks = [(fund_name, *analyzer._fund_ranges[fund_name]) for fund_name in funds]
+            
+            print(f"Writing {len(tasks)} reports with {workers} workers")
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_report_worker,
+                                         initargs=(dataset_path, output_dir, cache_dir)) as pool:
+                    for (fund_name, _, _), (report_path, sections) in zip(tasks, pool.map(_report_worker, tasks)):
+                        default_metrics().merge_sections(sections)
+                        written.append(fund_name)
+                        print(f"Analysis saved to {report_path}")
+            finally:
+                os.remove(dataset_path)
+    finally:
+        # Record fingerprints only for reports that were actually written
+        fingerprints.update({fund_name: current[fund_name] for fund_name in written})
+        save_fingerprints(output_dir, fingerprints)
+    
+    print(f"Reports regenerated: {len(written)}, unchanged and skipped: {skipped}")
+    return {'regenerated': len(written), 'skipped': skipped}
 
 if __name__ == "__main__":
-    # Read the CSV file
-    df = pd.read_csv('filling/fund_0001273087/form13f_holdings.csv')
+    # Read one fund from the Parquet store, falling back to its CSV
+    df = read_holdings(cik='0001273087')
+    if df.empty:
+        df = pd.read_csv('filling/fund_0001273087/form13f_holdings.csv')
     
     # Add Fund Name column if it doesn't exist
     if 'Fund Name' not in df.columns:
         df['Fund Name'] = 'Millennium Management LLC'  # Using actual fund name
     
     # Save analysis
-    save_fund_analysis(df)
\ No newline at end of file
+    save_fund_analysis(df)
+    default_metrics().write_report(os.path.join('filling', 'analysis', 'run_report.json'))
\ No newline at end of file
@@ -0,0 +1,56 @@
+import argparse
+import time
+
+from analysis import HedgeFundAnalyzer
+from synthetic_13f import generate_holdings_frame
+
+
+def time_reports(analyzer, funds):
+    """Seconds to run every per-fund computation behind an HTML report"""
+    start = time.perf_counter()
+    for fund_name in funds:
+        analyzer.generate_fund_summary(fund_name)
+        analyzer.plot_portfolio_evolution(fund_name)
+        analyzer.calculate_turnover(fund_name)
+        analyzer.analyze_sector_exposure(fund_name)
+    return time.perf_counter() - start
+
+
+def time_lookups(analyzer, funds):
+    """Seconds for indexed fund slices vs. full-table boolean masks"""
+    start = time.perf_counter()
+    for fund_name in funds:
+        analyzer.fund_slice(fund_name)
+    indexed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for fund_name in funds:
+        analyzer.df[analyzer.df['Fund Name'] == fund_name]
+    masked = time.perf_counter() - start
+    return indexed, masked
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HedgeFundAnalyzer report generation against fund count')
+    parser.add_argument('--funds', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--quarters', type=int, default=12)
+    parser.add_argument('--positions', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'funds':>6} {'rows':>10} {'build':>8} {'reports':>9} {'per fund':>9} {'indexed':>9} {'masked':>9}")
+    for n_funds in args.funds:
+        df = generate_holdings_frame(n_funds, args.quarters, args.positions)
+
+        start = time.perf_counter()
+        analyzer = HedgeFundAnalyzer(df)
+        build = time.perf_counter() - start
+
+        funds = analyzer.funds()
+        reports = time_reports(analyzer, funds)
+        indexed, masked = time_lookups(analyzer, funds)
+        print(f"{n_funds:>6} {len(df):>10,} {build:>7.2f}s {reports:>8.2f}s {reports / n_funds * 1000:>7.1f}ms "
+              f"{indexed * 1000:>7.1f}ms {masked * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+from info_table_parser import HOLDING_COLUMNS, empty_columns, parse_info_table
+from synthetic_13f import write_info_table
+
+
+def legacy_parse(file_path):
+    """The original ET.parse + findall implementation, kept for comparison"""
+    all_holdings = []
+    root = ET.parse(file_path).getroot()
+    namespace = {'ns': 'http://www.sec.gov/edgar/document/thirteenf/informationtable'}
+    for entry in root.findall('.//ns:infoTable', namespace):
+        all_holdings.append({
+            'NAME OF ISSUER': entry.find('.//ns:nameOfIssuer', namespace).text.strip(),
+            'TITLE OF CLASS': entry.find('.//ns:titleOfClass', namespace).text.strip(),
+            'CUSIP': entry.find('.//ns:cusip', namespace).text.strip(),
+            'VALUE (x$1000)': float(entry.find('.//ns:value', namespace).text.strip()),
+            'SHRS OR PRN AMT': float(entry.find('.//ns:sshPrnamt', namespace).text.strip()),
+            'SH/PRN': entry.find('.//ns:sshPrnamtType', namespace).text.strip(),
+            'PUT/CALL': entry.find('.//ns:putCall', namespace).text.strip() if entry.find('.//ns:putCall', namespace) is not None else '',
+            'INVESTMENT DISCRETION': entry.find('.//ns:investmentDiscretion', namespace).text.strip(),
+            'OTHER MANAGER': entry.find('.//ns:otherManager', namespace).text.strip() if entry.find('.//ns:otherManager', namespace) is not None else '',
+            'VOTING AUTHORITY SOLE': int(entry.find('.//ns:votingAuthority/ns:Sole', namespace).text.strip()),
+            'VOTING AUTHORITY SHARED': int(entry.find('.//ns:votingAuthority/ns:Shared', namespace).text.strip()),
+            'VOTING AUTHORITY NONE': int(entry.find('.//ns:votingAuthority/ns:None', namespace).text.strip()),
+            'Filing Number': os.path.basename(os.path.dirname(file_path))
+        })
+    return pd.DataFrame(all_holdings)
+
+
+def streaming_parse(file_path):
+    columns, _ = parse_info_table(file_path, os.path.basename(os.path.dirname(file_path)), empty_columns())
+    return pd.DataFrame(columns, columns=HOLDING_COLUMNS)
+
+
+def measure(parse, file_path):
+    """Return (seconds, peak traced MiB, rows) for one parse"""
+    start = time.perf_counter()
+    rows = len(parse(file_path))
+    elapsed = time.perf_counter() - start
+
+    # Memory is measured in a separate pass because tracemalloc slows parsing down
+    tracemalloc.start()
+    parse(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the 13F information table parsers')
+    parser.add_argument('--rows', type=int, default=50_000, help='Rows in the synthetic filing')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = write_info_table(os.path.join(tmp, 'filing_bench', 'form13fInfoTable.xml'), args.rows, args.seed)
+        size_mb = os.path.getsize(file_path) / 2 ** 20
+        print(f"Synthetic filing: {args.rows:,} rows, {size_mb:.1f} MiB")
+
+        results = {}
+        for name, parse in [('legacy', legacy_parse), ('streaming', streaming_parse)]:
+            elapsed, peak, rows = measure(parse, file_path)
+            results[name] = elapsed
+            print(f"{name:>10}: {elapsed:.2f}s, {rows / elapsed:,.0f} rows/s, peak {peak:.1f} MiB")
+
+        print(f"Speedup: {results['legacy'] / results['streaming']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from analysis import HedgeFundAnalyzer, save_fund_analysis
+from form13f_scraper import parse_filing_tree
+from synthetic_13f import generate_holdings_frame, write_filing_tree
+
+DEFAULT_OUTPUT = 'bench_baseline.json'
+# A stage this much slower than the baseline is flagged in the comparison
+REGRESSION_THRESHOLD = 0.10
+
+
+def run_stage(fn, memory=False, quiet=True, setup=None):
+    """(seconds, peak traced MiB or None, result) of one call, hiding its prints when quiet
+
+    With setup, each pass calls fn(setup()) and only fn is measured.
+    """
+    out = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    with out:
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        result = fn(arg) if setup else fn()
+        elapsed = time.perf_counter() - start
+
+        peak = None
+        if memory:
+            # A second, traced pass: tracemalloc slows the code down too much to time it
+            arg = setup() if setup else None
+            tracemalloc.start()
+            fn(arg) if setup else fn()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak = round(peak / 2 ** 20, 1)
+    return elapsed, peak, result
+
+
+def run_suite(args):
+    """Time every stage at the requested scale, returning {stage: numbers}"""
+    stages = {}
+    quiet = not args.verbose
+
+    def report(name, seconds, peak, note=''):
+        print(f"{name:<28} {seconds:>9.3f}s  {'' if peak is None else f'peak {peak:,.1f} MiB  '}{note}".rstrip())
+
+    def record(name, fn, memory=None, setup=None):
+        memory = not args.no_memory if memory is None else memory
+        seconds, peak, result = run_stage(fn, memory, quiet, setup)
+        stages[name] = {'seconds': round(seconds, 4), 'peak_mib': peak}
+        report(name, seconds, peak)
+        return result
+
+    df = record('generate frame', lambda: generate_holdings_frame(
+        args.funds, args.quarters, args.positions, args.seed, args.option_share, amendment_share=args.amendment_share))
+    stages['generate frame']['rows'] = len(df)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tree = os.path.join(tmp, 'filling')
+        filings = record('write filing tree', lambda: write_filing_tree(tree, df), memory=False)
+        size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tree) for name in names)
+        stages['write filing tree'].update(filings=filings, mib=round(size / 2 ** 20, 1))
+
+        # The traced pass parses in-process, since worker processes are invisible to tracemalloc
+        seconds, _, holdings = run_stage(lambda: parse_filing_tree(tree, workers=args.workers), quiet=quiet)
+        parsed_rows = sum(len(frame) for frame in holdings.values())
+        peak = None
+        if not args.no_memory:
+            _, peak, _ = run_stage(lambda: parse_filing_tree(tree, workers=1), memory=True, quiet=quiet)
+        stages['parse'] = {'seconds': round(seconds, 4), 'peak_mib': peak, 'filings': filings, 'rows': parsed_rows,
+                           'rows_per_second': round(parsed_rows / seconds) if seconds else 0}
+        report('parse', seconds, peak, f"{parsed_rows / seconds:,.0f} rows/s")
+        if parsed_rows != len(df):
+            print(f"Warning: parsed {parsed_rows} rows but generated {len(df)}")
+
+        analyzer = record('analyzer build', lambda: HedgeFundAnalyzer(df))
+        funds = analyzer.funds()
+
+        # Every pass gets a fresh analyzer, so no method is timed against cached results
+        def fresh():
+            return HedgeFundAnalyzer(df, security_master=analyzer.security_master)
+
+        for method in ['generate_fund_summary', 'calculate_turnover', 'generate_html_report']:
+            record(method, lambda fresh_analyzer, method=method: [
+                getattr(fresh_analyzer, method)(fund_name) for fund_name in funds
+            ], setup=fresh)
+        record('calculate_turnover_all', lambda fresh_analyzer: fresh_analyzer.calculate_turnover_all(), setup=fresh)
+
+        output_dir = os.path.join(tmp, 'analysis')
+        record('save_fund_analysis', lambda: save_fund_analysis(df, output_dir, cache_dir=None, workers=args.workers,
+                                                                force=True), memory=False)
+    return stages
+
+
+def load_baseline(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(stages, baseline, baseline_path):
+    """Print each stage's time against a saved baseline"""
+    if baseline.get('params') != stages['params']:
+        print(f"Note: {baseline_path} was run with different parameters: {baseline.get('params')}")
+
+    print(f"\n{'stage':<28} {'baseline':>10} {'now':>10} {'change':>8}")
+    regressions = 0
+    for name, numbers in stages['stages'].items():
+        before = baseline.get('stages', {}).get(name, {}).get('seconds')
+        if not before:
+            continue
+        change = numbers['seconds'] / before - 1
+        slower = change > REGRESSION_THRESHOLD
+        regressions += slower
+        print(f"{name:<28} {before:>9.3f}s {numbers['seconds']:>9.3f}s {change:>+7.0%}{'  SLOWER' if slower else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parsing and analysis on synthetic 13F filings, offline')
+    parser.add_argument('--funds', type=int, default=20)
+    parser.add_argument('--quarters', type=int, default=8)
+    parser.add_argument('--positions', type=int, default=200, help='Positions per filing')
+    parser.add_argument('--option-share', type=float, default=0.05, help='Share of positions that are puts or calls')
+    parser.add_argument('--amendment-share', type=float, default=0.1, help='Share of fund-quarters that are amended')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='Skip the traced passes that measure peak memory')
+    parser.add_argument('--verbose', action='store_true', help="Show the benchmarked code's own output")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Where to save the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against a previously saved baseline')
+    args = parser.parse_args()
+    # Read before anything is written: --output may name the baseline itself
+    baseline = load_baseline(args.compare) if args.compare else None
+
+    params = {key: getattr(args, key) for key in ('funds', 'quarters', 'positions', 'option_share', 'amendment_share',
+                                                   'workers', 'seed')}
+    print(f"Synthetic data: {params}")
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'params': params,
+        'stages': run_suite(args),
+    }
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.compare)
+        print(f"{regressions} stages more than {REGRESSION_THRESHOLD:.0%} slower than {args.compare}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=1)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
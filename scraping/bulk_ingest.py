@@ -0,0 +1,192 @@
+import gzip
+import io
+import os
+import re
+import zipfile
+
+import pandas as pd
+
+from amendments import reconcile_amendments
+from info_table_parser import HOLDING_COLUMNS
+
+FORM13F_TYPES = {'13F-HR', '13F-HR/A'}
+
+# form.idx is fixed-width with runs of spaces between fields; company names contain single spaces
+FORM_IDX_LINE = re.compile(
+    r'^(?P<form>\S+(?: \S+)*?)\s{2,}(?P<company>.+?)\s{2,}(?P<cik>\d+)\s+(?P<date>\d{4}-?\d{2}-?\d{2})\s+(?P<filename>\S+)\s*$'
+)
+ACCESSION_IN_FILENAME = re.compile(r'(\d{10}-\d{2}-\d{6})')
+
+# Column mapping from the SEC Form 13F data set INFOTABLE.tsv to the scraper's holdings columns
+DATASET_COLUMNS = {
+    'NAMEOFISSUER': 'NAME OF ISSUER',
+    'TITLEOFCLASS': 'TITLE OF CLASS',
+    'CUSIP': 'CUSIP',
+    'VALUE': 'VALUE (x$1000)',
+    'SSHPRNAMT': 'SHRS OR PRN AMT',
+    'SSHPRNAMTTYPE': 'SH/PRN',
+    'PUTCALL': 'PUT/CALL',
+    'INVESTMENTDISCRETION': 'INVESTMENT DISCRETION',
+    'OTHERMANAGER': 'OTHER MANAGER',
+    'VOTING_AUTH_SOLE': 'VOTING AUTHORITY SOLE',
+    'VOTING_AUTH_SHARED': 'VOTING AUTHORITY SHARED',
+    'VOTING_AUTH_NONE': 'VOTING AUTHORITY NONE',
+}
+INFOTABLE_CHUNKSIZE = 500_000
+
+
+def _normalize_ciks(ciks):
+    return {str(cik).zfill(10) for cik in ciks}
+
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='latin-1')
+    return open(path, 'r', encoding='latin-1')
+
+
+def _index_rows(path):
+    """Yield (cik, company, form, date, filename) from a master.idx or form.idx file"""
+    is_master = os.path.basename(path).lower().startswith('master')
+    with _open_text(path) as f:
+        for line in f:
+            if is_master:
+                parts = line.rstrip('\n').split('|')
+                if len(parts) != 5 or not parts[0].isdigit():
+                    continue
+                cik, company, form, date, filename = parts
+            else:
+                match = FORM_IDX_LINE.match(line.rstrip('\n'))
+                if not match:
+                    continue
+                form, company, cik, date, filename = match.group('form', 'company', 'cik', 'date', 'filename')
+            yield cik, company.strip(), form.strip(), date, filename
+
+
+def read_full_index(index_dir, ciks):
+    """13F-HR filings of the tracked CIKs from every quarterly index file in index_dir
+
+    Reads master.idx / form.idx files (optionally gzipped) in one pass each
+    and returns a frame with the same fields the submissions API provides:
+    cik, companyName, form, filingDate, accessionNumber, fileName.
+    """
+    tracked = _normalize_ciks(ciks)
+    records = []
+    for name in sorted(os.listdir(index_dir)):
+        if not re.match(r'(master|form).*\.idx(\.gz)?$', name, re.IGNORECASE):
+            continue
+        for cik, company, form, date, filename in _index_rows(os.path.join(index_dir, name)):
+            if form not in FORM13F_TYPES:
+                continue
+            cik = cik.zfill(10)
+            if cik not in tracked:
+                continue
+            accession = ACCESSION_IN_FILENAME.search(filename)
+            records.append({
+                'cik': cik,
+                'companyName': company,
+                'form': form,
+                'filingDate': pd.Timestamp(date).strftime('%Y-%m-%d'),
+                'accessionNumber': accession.group(1) if accession else '',
+                'fileName': filename,
+            })
+    filings = pd.DataFrame(records, columns=['cik', 'companyName', 'form', 'filingDate', 'accessionNumber', 'fileName'])
+    return filings.drop_duplicates(['cik', 'accessionNumber']).reset_index(drop=True)
+
+
+def _read_tsv(archive, name, **kwargs):
+    member = next((m for m in archive.namelist() if os.path.basename(m).upper() == name), None)
+    if member is None:
+        raise ValueError(f"{archive.filename} has no {name}")
+    return pd.read_csv(archive.open(member), sep='\t', dtype=str, keep_default_na=False, quoting=3, **kwargs)
+
+
+def _dataset_date(values):
+    # The data sets use dates like 31-DEC-2023
+    return pd.to_datetime(values, format='%d-%b-%Y', errors='coerce').dt.strftime('%Y-%m-%d')
+
+
+def load_13f_dataset(zip_path, ciks):
+    """Holdings of the tracked CIKs from one SEC Form 13F data set ZIP
+
+    SUBMISSION.tsv and COVERPAGE.tsv select the tracked filers' 13F-HR
+    accessions, then INFOTABLE.tsv is streamed in chunks keeping only those
+    accessions. Rows come back in the scraper's holdings columns plus
+    Filing Date, Report Date, Form, Amendment Type and CIK.
+    """
+    tracked = _normalize_ciks(ciks)
+    with zipfile.ZipFile(zip_path) as archive:
+        submissions = _read_tsv(archive, 'SUBMISSION.TSV')
+        submissions['CIK'] = submissions['CIK'].str.zfill(10)
+        submissions = submissions[
+            submissions['CIK'].isin(tracked) & submissions['SUBMISSIONTYPE'].isin(FORM13F_TYPES)
+        ]
+        if submissions.empty:
+            return pd.DataFrame()
+
+        try:
+            cover = _read_tsv(archive, 'COVERPAGE.TSV', usecols=['ACCESSION_NUMBER', 'AMENDMENTTYPE'])
+            submissions = submissions.merge(cover, on='ACCESSION_NUMBER', how='left')
+        except ValueError:
+            submissions['AMENDMENTTYPE'] = ''
+
+        accessions = set(submissions['ACCESSION_NUMBER'])
+        chunks = []
+        for chunk in _read_tsv(archive, 'INFOTABLE.TSV', chunksize=INFOTABLE_CHUNKSIZE):
+            chunk = chunk[chunk['ACCESSION_NUMBER'].isin(accessions)]
+            if not chunk.empty:
+                chunks.append(chunk)
+
+    if not chunks:
+        return pd.DataFrame()
+
+    info = pd.concat(chunks, ignore_index=True)
+    holdings = info.rename(columns=DATASET_COLUMNS)
+    for column in ['VALUE (x$1000)', 'SHRS OR PRN AMT']:
+        holdings[column] = pd.to_numeric(holdings[column], errors='coerce')
+    for column in ['VOTING AUTHORITY SOLE', 'VOTING AUTHORITY SHARED', 'VOTING AUTHORITY NONE']:
+        holdings[column] = pd.to_numeric(holdings[column], errors='coerce').fillna(0).astype('int64')
+    holdings['Filing Number'] = 'filing_' + holdings['ACCESSION_NUMBER']
+
+    # Attach per-filing fields once per accession
+    filings = submissions.set_index('ACCESSION_NUMBER')
+    accession = holdings['ACCESSION_NUMBER']
+    holdings['Filing Date'] = accession.map(_dataset_date(filings['FILING_DATE']))
+    holdings['Report Date'] = accession.map(_dataset_date(filings['PERIODOFREPORT']))
+    holdings['Form'] = accession.map(filings['SUBMISSIONTYPE'])
+    holdings['Amendment Type'] = accession.map(filings['AMENDMENTTYPE'].fillna(''))
+    holdings['CIK'] = accession.map(filings['CIK'])
+
+    return holdings[HOLDING_COLUMNS + ['Filing Date', 'Report Date', 'Form', 'Amendment Type', 'CIK']]
+
+
+def load_13f_datasets(dataset_dir, ciks):
+    """Holdings of the tracked CIKs from every Form 13F data set ZIP in dataset_dir
+
+    Amendments are reconciled with their originals per CIK and period.
+    """
+    frames = []
+    seen = set()
+    for name in sorted(os.listdir(dataset_dir)):
+        if not name.lower().endswith('.zip'):
+            continue
+        path = os.path.join(dataset_dir, name)
+        try:
+            frame = load_13f_dataset(path, ciks)
+        except (zipfile.BadZipFile, ValueError, KeyError) as e:
+            print(f"Error reading {path}: {e}")
+            continue
+        if frame.empty:
+            continue
+        # Data sets can overlap, so each accession is taken from the first file that has it
+        frame = frame[~frame['Filing Number'].isin(seen)]
+        seen.update(frame['Filing Number'].unique())
+        print(f"Loaded {len(frame)} holdings from {name}")
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame()
+    # An amendment can arrive in a later quarter's data set than its original
+    holdings = pd.concat(frames, ignore_index=True)
+    return pd.concat(
+        [reconcile_amendments(group) for _, group in holdings.groupby('CIK', sort=False)], ignore_index=True
+    )
@@ -1,18 +1,135 @@
-import requests
 from bs4 import BeautifulSoup
-import time
-import random
+import argparse
+import json
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import numpy as np
 import pandas as pd
+from sec_client import SecClient
 
-def lookup_cik(company_name):
+# SEC bulk name files: company_tickers.json or cik-lookup-data.txt (NAME:CIK: per line)
+DEFAULT_NAMES_FILE = 'scraping/cik-lookup-data.txt'
+MIN_CONFIDENCE = 0.85
+AMBIGUITY_MARGIN = 0.05
+LOOKUP_WORKERS = 4
+
+# Legal-form words dropped from the end of names so "Bridgewater Associates, LP" matches "BRIDGEWATER ASSOCIATES"
+LEGAL_SUFFIXES = {'LLC', 'LP', 'L P', 'LLP', 'INC', 'CORP', 'CORPORATION', 'LTD', 'LIMITED', 'CO', 'PLC', 'SA', 'AG', 'NV', 'GMBH'}
+# Only trailing ones, possibly several ("CO LTD"), and never the whole name
+_SUFFIX_PATTERN = re.compile(r'(?: (?:' + '|'.join(sorted((re.escape(s) for s in LEGAL_SUFFIXES), key=len, reverse=True)) + r'))+$')
+
+def normalize_name(name):
+    """Uppercase, drop punctuation and legal-form suffixes, collapse whitespace"""
+    name = str(name).upper().replace('&', ' AND ')
+    name = re.sub(r'[^A-Z0-9 ]', ' ', name.replace('.', ''))
+    return _SUFFIX_PATTERN.sub('', ' '.join(name.split()))
+
+def trigrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def similarity(a, b):
+    """Dice coefficient of the trigram sets of two names (0-1)"""
+    a, b = trigrams(normalize_name(a)), trigrams(normalize_name(b))
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 0.0
+
+def load_company_names(path=DEFAULT_NAMES_FILE):
+    """(name, CIK) pairs from company_tickers.json or cik-lookup-data.txt"""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        entries = data.values() if isinstance(data, dict) else data
+        return [(entry['title'], str(entry['cik_str']).zfill(10)) for entry in entries]
+    
+    pairs = []
+    with open(path, 'r', encoding='latin-1') as f:
+        for line in f:
+            # Names may contain colons, so the CIK is the last field
+            name, _, cik = line.rstrip().rstrip(':').rpartition(':')
+            if name and cik.isdigit():
+                pairs.append((name, cik.zfill(10)))
+    return pairs
+
+class NameIndex:
+    """In-memory index of SEC filer names for exact and trigram fuzzy matching
+    
+    Normalized names are looked up exactly first. Otherwise every name
+    sharing a trigram with the query is scored by the Dice coefficient
+    of the two trigram sets, using flat postings arrays sorted by trigram.
+    """
+    
+    def __init__(self, pairs):
+        self.names = np.array([name for name, _ in pairs], dtype=object)
+        self.ciks = np.array([cik for _, cik in pairs], dtype=object)
+        
+        self._exact = defaultdict(list)
+        trigram_ids = {}
+        postings_trigram, postings_entry, sizes = [], [], np.zeros(len(pairs), dtype=np.int32)
+        for entry, name in enumerate(self.names):
+            normalized = normalize_name(name)
+            self._exact[normalized].append(entry)
+            grams = trigrams(normalized)
+            sizes[entry] = len(grams)
+            for gram in grams:
+                postings_trigram.append(trigram_ids.setdefault(gram, len(trigram_ids)))
+                postings_entry.append(entry)
+        
+        order = np.argsort(np.asarray(postings_trigram, dtype=np.int32), kind='stable')
+        self._trigram_ids = trigram_ids
+        self._postings_trigram = np.asarray(postings_trigram, dtype=np.int32)[order]
+        self._postings_entry = np.asarray(postings_entry, dtype=np.int32)[order]
+        self._sizes = sizes
+    
+    @classmethod
+    def from_file(cls, path=DEFAULT_NAMES_FILE):
+        return cls(load_company_names(path))
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def _candidates(self, normalized):
+        """Dice score of every indexed name sharing a trigram with the query"""
+        ids = [self._trigram_ids[gram] for gram in trigrams(normalized) if gram in self._trigram_ids]
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        ids = np.asarray(ids, dtype=np.int32)
+        starts = np.searchsorted(self._postings_trigram, ids, side='left')
+        stops = np.searchsorted(self._postings_trigram, ids, side='right')
+        entries = np.concatenate([self._postings_entry[start:stop] for start, stop in zip(starts, stops)])
+        candidates, shared = np.unique(entries, return_counts=True)
+        scores = 2 * shared / (len(trigrams(normalized)) + self._sizes[candidates])
+        return candidates, scores
+    
+    def match(self, company_name, limit=3):
+        """Best matches for a name as a list of (cik, name, confidence), highest first"""
+        normalized = normalize_name(company_name)
+        exact = self._exact.get(normalized)
+        if exact:
+            return [(self.ciks[entry], self.names[entry], 1.0) for entry in exact[:limit]]
+        
+        candidates, scores = self._candidates(normalized)
+        best = np.argsort(-scores, kind='stable')[:limit]
+        return [(self.ciks[candidates[i]], self.names[candidates[i]], float(scores[i])) for i in best]
+
+def _resolution(company, matches, source):
+    """One result row from a company's ranked matches"""
+    if not matches:
+        return {'Hedge Fund Name': company, 'CIK': 'NOT_FOUND', 'Matched Name': '', 'Confidence': 0.0,
+                'Source': source, 'Ambiguous': False}
+    cik, name, confidence = matches[0]
+    # Two different CIKs scoring about the same means the pick needs a human look
+    ambiguous = any(other_cik != cik and confidence - score <= AMBIGUITY_MARGIN for other_cik, _, score in matches[1:])
+    return {'Hedge Fund Name': company, 'CIK': cik, 'Matched Name': name, 'Confidence': round(confidence, 3),
+            'Source': source, 'Ambiguous': ambiguous}
+
+def lookup_cik(company_name, client=None):
     """Look up CIK using SEC's web form"""
     url = "https://www.sec.gov/cgi-bin/cik_lookup"
     headers = {
-        "User-Agent": "Individual Investor (your.email@domain.com)",  # Replace with your email
-        "Accept": "text/html,application/xhtml+xml",
-        "Accept-Encoding": "gzip, deflate",
-        "Host": "www.sec.gov"
+        "Accept": "text/html,application/xhtml+xml"
     }
     
     # Form data
@@ -21,7 +138,8 @@ def lookup_cik(company_name):
     }
     
     try:
-        response = requests.post(url, headers=headers, data=data)
+        client = client or SecClient()
+        response = client.post(url, data=data, headers=headers)
         if response.status_code == 200:
             # Parse the response HTML
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -34,68 +152,91 @@ def lookup_cik(company_name):
                 for link in links:
                     if 'CIK=' in link.get('href', ''):
                         cik = link.text.strip()
-                        company = result.text.split(cik)[1].strip()
+                        # The name runs from the CIK to the end of its line
+                        company = result.text.split(cik, 1)[1].strip().split('\n', 1)[0].strip()
                         return cik, company
             
             return None, "No match found"
         else:
             return None, f"Error: Status code {response.status_code}"
-            
+    
     except Exception as e:
         return None, f"Error: {str(e)}"
 
-def process_companies(filename='scraping/cik/hedge_fund_names.txt'):
-    """Process all companies with careful rate limiting"""
+def _lookup_online(company, client):
+    cik, result = lookup_cik(company, client)
+    if not cik:
+        print(f"No CIK found online for {company}: {result}")
+        return _resolution(company, [], 'online')
+    return _resolution(company, [(cik.zfill(10), result, similarity(company, result))], 'online')
+
+def resolve_companies(companies, index, min_confidence=MIN_CONFIDENCE, online=True, client=None, workers=LOOKUP_WORKERS):
+    """Resolve company names to CIKs, in memory first and online only for misses
     
-    # Load companies
-    with open(filename, 'r') as f:
-        companies = [line.strip() for line in f.readlines()]
+    Returns one row per name with the CIK (or NOT_FOUND), matched SEC name,
+    confidence, source (exact, fuzzy or online) and an ambiguity flag.
+    """
+    rows = []
+    for company in companies:
+        matches = index.match(company)
+        source = 'exact' if matches and matches[0][2] == 1.0 else 'fuzzy'
+        rows.append(_resolution(company, matches, source))
     
-    # Create DataFrame to store results
-    results_df = pd.DataFrame(columns=['Hedge Fund Name', 'CIK'])
+    misses = [i for i, row in enumerate(rows) if row['Confidence'] < min_confidence]
+    if online and misses:
+        print(f"Looking up {len(misses)} names online")
+        if client is None:
+            client = SecClient()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            found = list(pool.map(lambda i: _lookup_online(rows[i]['Hedge Fund Name'], client), misses))
+        for i, row in zip(misses, found):
+            # Keep the offline candidate when the online form found nothing better
+            if row['Confidence'] >= rows[i]['Confidence'] or (row['CIK'] != 'NOT_FOUND' and rows[i]['CIK'] == 'NOT_FOUND'):
+                rows[i] = row
     
-    print(f"Total companies to process: {len(companies)}")
-    print("Starting lookups...")
+    results = pd.DataFrame(rows)
+    rejected = results['Confidence'] < min_confidence
+    results.loc[rejected, 'CIK'] = 'NOT_FOUND'
+    results.loc[rejected, 'Ambiguous'] = False
+    return results
+
+def process_companies(filename='scraping/hedge_fund_names.txt', names_file=DEFAULT_NAMES_FILE,
+                      output='scraping/hedge_funds_with_ciks.csv', min_confidence=MIN_CONFIDENCE, online=True):
+    """Resolve every company in filename and save the results"""
     
-    found_count = 0
+    # Load companies
+    with open(filename, 'r') as f:
+        companies = [line.strip() for line in f if line.strip()]
     
-    for i, company in enumerate(companies, 1):
-        print(f"[{i}/{len(companies)}] Looking up: {company}")
-        
-        # Random delay between 3 and 5 seconds
-        delay = random.uniform(3, 5)
-        time.sleep(delay)
-        
-        cik, result = lookup_cik(company)
-        
-        if cik:
-            found_count += 1
-            print(f"Found CIK: {cik}")
-            results_df.loc[len(results_df)] = [company, cik]
-        else:
-            print(f"No CIK found: {result}")
-            results_df.loc[len(results_df)] = [company, 'NOT_FOUND']
-        
-        # Every 10 requests, take a longer break
-        if i % 10 == 0:
-            long_delay = random.uniform(10, 15)
-            print(f"Taking a {long_delay:.1f} second break...")
-            time.sleep(long_delay)
-        
-        # Save progress periodically
-        if i % 5 == 0:
-            results_df.to_csv('scraping/hedge_funds_with_ciks.csv', index=False)
-            print("Progress saved")
+    print(f"Total companies to process: {len(companies)}")
+    start = datetime.now()
+    index = NameIndex.from_file(names_file)
+    print(f"Indexed {len(index)} SEC names from {names_file} in {(datetime.now() - start).total_seconds():.1f}s")
     
-    # Save final results
-    results_df.to_csv('scraping/hedge_funds_with_ciks.csv', index=False)
+    results_df = resolve_companies(companies, index, min_confidence, online)
+    results_df.to_csv(output, index=False)
     
+    found = results_df['CIK'] != 'NOT_FOUND'
     print("\nFinal Summary:")
     print(f"Total companies processed: {len(companies)}")
-    print(f"CIKs found: {found_count}")
-    print(f"Missing CIKs: {len(companies) - found_count}")
-    print("Results saved to 'hedge_funds_with_ciks.csv'")
+    print(f"CIKs found: {found.sum()} ({results_df.loc[found, 'Source'].value_counts().to_dict()})")
+    print(f"Ambiguous matches to review: {results_df['Ambiguous'].sum()}")
+    print(f"Missing CIKs: {(~found).sum()}")
+    print(f"Results saved to '{output}'")
+    return results_df
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve hedge fund names to SEC CIKs")
+    parser.add_argument('--names', default='scraping/hedge_fund_names.txt')
+    parser.add_argument('--sec-names', default=DEFAULT_NAMES_FILE,
+                        help="SEC company_tickers.json or cik-lookup-data.txt")
+    parser.add_argument('--output', default='scraping/hedge_funds_with_ciks.csv')
+    parser.add_argument('--min-confidence', type=float, default=MIN_CONFIDENCE)
+    parser.add_argument('--offline', action='store_true', help="Do not fall back to SEC's online lookup form")
+    args = parser.parse_args()
+    
     print(f"Starting CIK lookup process at {datetime.now()}")
-    process_companies('scraping/hedge_fund_names.txt')
\ No newline at end of file
+    if not os.path.exists(args.sec_names):
+        print(f"{args.sec_names} not found; download it from https://www.sec.gov/Archives/edgar/cik-lookup-data.txt")
+        exit(1)
+    process_companies(args.names, args.sec_names, args.output, args.min_confidence, not args.offline)
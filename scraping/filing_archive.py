@@ -0,0 +1,202 @@
+import argparse
+import contextlib
+import gzip
+import hashlib
+import io
+import os
+import shutil
+import sqlite3
+import threading
+
+from amendments import COVER_PAGE_FILE
+
+DEFAULT_ARCHIVE_PATH = os.path.join('filling', 'archive.sqlite')
+INFO_TABLE_NAME = 'form13fInfoTable.xml'
+COMPRESSION_LEVEL = 6
+
+
+def member_path(fund_dir, accession, name=INFO_TABLE_NAME):
+    """Path an archived document would have in the old <fund_dir>/filing_<accession>/ layout"""
+    return os.path.join(fund_dir, f"filing_{accession}", name)
+
+
+def split_member_path(path):
+    """(accession, name) of a member path"""
+    filing_dir, name = os.path.split(path)
+    return os.path.basename(filing_dir).replace('filing_', '', 1), name
+
+
+class FilingArchive:
+    """Content-addressed store of raw filing documents in a single SQLite file
+
+    Each distinct document is gzip-compressed once into the blobs table,
+    keyed by the SHA-256 of its raw bytes; the documents table maps
+    (CIK, accession, file name) to a blob. Listing is one indexed query
+    and reads stream-decompress straight from the blob.
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS blobs (
+                id INTEGER PRIMARY KEY,
+                sha256 TEXT NOT NULL UNIQUE,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                cik TEXT NOT NULL,
+                accession_number TEXT NOT NULL,
+                name TEXT NOT NULL,
+                blob_id INTEGER NOT NULL REFERENCES blobs (id),
+                PRIMARY KEY (cik, accession_number, name)
+            );
+        """)
+        self._conn.commit()
+
+    def put(self, cik, accession, name, content):
+        """Store a document, reusing the blob if identical bytes are already archived"""
+        digest = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM blobs WHERE sha256 = ?", (digest,)).fetchone()
+            if row is None:
+                compressed = gzip.compress(content, COMPRESSION_LEVEL, mtime=0)
+                blob_id = self._conn.execute(
+                    "INSERT INTO blobs (sha256, size, stored_size, data) VALUES (?, ?, ?, ?)",
+                    (digest, len(content), len(compressed), compressed)
+                ).lastrowid
+            else:
+                blob_id = row[0]
+            self._conn.execute(
+                "INSERT INTO documents (cik, accession_number, name, blob_id) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (cik, accession_number, name) DO UPDATE SET blob_id = excluded.blob_id",
+                (cik, accession, name, blob_id)
+            )
+            self._conn.commit()
+        return digest
+
+    def _blob_id(self, cik, accession, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blob_id FROM documents WHERE cik = ? AND accession_number = ? AND name = ?",
+                (cik, accession, name)
+            ).fetchone()
+        return row[0] if row else None
+
+    def has(self, cik, accession, name=INFO_TABLE_NAME):
+        return self._blob_id(cik, accession, name) is not None
+
+    @contextlib.contextmanager
+    def open(self, cik, accession, name=INFO_TABLE_NAME):
+        """Binary stream of a document's raw bytes, decompressed as it is read"""
+        blob_id = self._blob_id(cik, accession, name)
+        if blob_id is None:
+            raise KeyError(f"{cik}/{accession}/{name} is not archived")
+        if hasattr(self._conn, 'blobopen'):
+            blob = self._conn.blobopen('blobs', 'data', blob_id, readonly=True)
+        else:
+            with self._lock:
+                data = self._conn.execute("SELECT data FROM blobs WHERE id = ?", (blob_id,)).fetchone()[0]
+            blob = io.BytesIO(data)
+        try:
+            with gzip.GzipFile(fileobj=blob, mode='rb') as stream:
+                yield stream
+        finally:
+            blob.close()
+
+    def read(self, cik, accession, name=INFO_TABLE_NAME):
+        with self.open(cik, accession, name) as stream:
+            return stream.read()
+
+    def documents(self, cik=None, name=INFO_TABLE_NAME):
+        """(cik, accession) of archived documents, in blob (storage) order"""
+        query = "SELECT d.cik, d.accession_number FROM documents d WHERE d.name = ?"
+        params = [name]
+        if cik is not None:
+            query += " AND d.cik = ?"
+            params.append(cik)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY d.blob_id", params).fetchall()
+
+    def ciks(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT cik FROM documents ORDER BY cik")]
+
+    def paths(self, fund_dir, cik, name=INFO_TABLE_NAME):
+        """Member paths of a fund's archived documents, sorted like find_info_tables"""
+        return sorted(member_path(fund_dir, accession, name) for _, accession in self.documents(cik, name))
+
+    def stats(self):
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            blobs, size, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+        return {'documents': documents, 'blobs': blobs, 'size': size, 'stored_size': stored}
+
+    def summary(self):
+        stats = self.stats()
+        ratio = stats['size'] / stats['stored_size'] if stats['stored_size'] else 0
+        return (f"{stats['documents']} documents in {stats['blobs']} blobs, "
+                f"{stats['size'] / 2**20:.1f} MiB stored as {stats['stored_size'] / 2**20:.1f} MiB ({ratio:.1f}x)")
+
+    def import_tree(self, base_dir, remove=False, manifest=None):
+        """Archive every fund_<cik>/filing_<accession>/*.xml file under base_dir
+
+        With remove, each filing directory is deleted once all of its files
+        are archived. With a manifest, each filing imported with both its
+        information table and cover page is recorded as downloaded, so runs
+        against the archive do not fetch it again.
+        """
+        imported = 0
+        for fund in sorted(os.listdir(base_dir)):
+            fund_dir = os.path.join(base_dir, fund)
+            if not fund.startswith('fund_') or not os.path.isdir(fund_dir):
+                continue
+            cik = fund.replace('fund_', '', 1)
+            for filing in sorted(os.listdir(fund_dir)):
+                filing_dir = os.path.join(fund_dir, filing)
+                if not filing.startswith('filing_') or not os.path.isdir(filing_dir):
+                    continue
+                accession = filing.replace('filing_', '', 1)
+                info_table, has_cover_page = None, False
+                for name in sorted(os.listdir(filing_dir)):
+                    if name.endswith('.xml'):
+                        with open(os.path.join(filing_dir, name), 'rb') as f:
+                            content = f.read()
+                        # Older downloads kept the information table's original file name
+                        if name == COVER_PAGE_FILE:
+                            has_cover_page = True
+                        else:
+                            name, info_table = INFO_TABLE_NAME, content
+                        self.put(cik, accession, name, content)
+                        imported += 1
+                if manifest is not None and info_table is not None and has_cover_page:
+                    manifest.record_download(cik, accession, member_path(fund_dir, accession), info_table)
+                if remove:
+                    shutil.rmtree(filing_dir)
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move downloaded filing directories into the compressed archive")
+    parser.add_argument('--base-dir', default='filling')
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_PATH)
+    parser.add_argument('--remove', action='store_true', help="Delete filing directories once archived")
+    args = parser.parse_args()
+
+    archive = FilingArchive(args.archive)
+    print(f"Archived {archive.import_tree(args.base_dir, args.remove)} documents from {args.base_dir}")
+    print(archive.summary())
+    archive.close()
@@ -1,27 +1,37 @@
 import requests
 import pandas as pd
-from datetime import datetime
+import numpy as np
 import os
-import time
-from bs4 import BeautifulSoup
-import warnings
 import xml.etree.ElementTree as ET
 import re
+import json
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from sec_client import SecClient
+from http_cache import HttpCache
+from info_table_parser import HOLDING_COLUMNS, empty_columns, find_info_tables, merge_columns, parse_files
+from amendments import COVER_PAGE_FIELDS, COVER_PAGE_FILE, read_cover_page, reconcile_amendments, report_period
+from fund_relationships import RelationshipGraph, accession_filer, add_cover_pages
+from filing_archive import INFO_TABLE_NAME, split_member_path
+from run_report import default_metrics
 
-def process_form13f_filings(cik, start_date=None, end_date=None):
+SEC_DATA_URL = "https://data.sec.gov"
+SEC_ARCHIVES_URL = "https://www.sec.gov/Archives/edgar/data"
+DOWNLOAD_WORKERS = 8
+INFO_TABLE_URL_CACHE = 'info_table_urls.json'
+FILING_METADATA_FILE = 'form13f_metadata.csv'
+FILING_METADATA_COLUMNS = ['accessionNumber', 'form', 'filingDate', 'reportDate', 'primaryDocument']
+
+_http_cache = None
+_sec_client = None
+
+def process_form13f_filings(cik, start_date=None, end_date=None, cache=None, client=None):
     """Process Form 13F filings for a given CIK"""
     base_dir = f"filings_13f_{cik}"
     os.makedirs(base_dir, exist_ok=True)
     
-    url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-    headers = {
-        "User-Agent": "YourCompany yourname@email.com"  # Replace with your details
-    }
-    
     try:
-        response = requests.get(url, headers=headers)
-        data = response.json()
+        data = get_submissions(cik, client, cache)
         recent_filings = pd.DataFrame(data['filings']['recent'])
         
         # Convert filingDate to datetime
@@ -50,7 +60,7 @@ def process_form13f_filings(cik, start_date=None, end_date=None):
             info_table_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{acc_no_clean}/xslForm13F_X02/form13fInfoTable.xml"
             
             try:
-                response = requests.get(info_table_url, headers=headers)
+                response = _get(info_table_url, client)
                 response.raise_for_status()
                 
                 # Save raw XML
@@ -75,12 +85,12 @@ def process_form13f_filings(cik, start_date=None, end_date=None):
                         'VOTING AUTHORITY SOLE': info_table.find('votingAuthority').find('Sole').text.strip(),
                         'VOTING AUTHORITY SHARED': info_table.find('votingAuthority').find('Shared').text.strip(),
                         'VOTING AUTHORITY NONE': info_table.find('votingAuthority').find('None').text.strip(),
-                        'Filing Date': filing['filingDate'].strftime('%Y-%m-%d')
+                        'Filing Date': filing['filingDate'].strftime('%Y-%m-%d'),
+                        'Report Date': filing['reportDate']
                     }
                     all_holdings.append(holding)
                 
                 print(f"Processed {len(all_holdings)} holdings from filing {filing['accessionNumber']}")
-                time.sleep(0.1)  # Respect SEC rate limits
                 
             except Exception as e:
                 print(f"Error processing filing {filing['accessionNumber']}: {e}")
@@ -132,184 +142,423 @@ def clean_text(text):
         return ""
     return re.sub(r'\s+', ' ', text.strip())
 
-def download_form13f_files(cik, base_dir):
-    """Download Form 13F files"""
+def default_sec_client():
+    """Pooled, rate-limited client used when none is passed in"""
+    global _sec_client
+    if _sec_client is None:
+        _sec_client = SecClient()
+    return _sec_client
+
+def _get(url, client=None, headers=None):
+    """GET a URL through the shared SEC client"""
+    return (client or default_sec_client()).get(url, headers=headers)
+
+def default_http_cache():
+    """HTTP cache shared by every function that reads submissions JSON"""
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HttpCache()
+    return _http_cache
+
+def submissions_url(cik):
+    return f"{SEC_DATA_URL}/submissions/CIK{str(cik).zfill(10)}.json"
+
+def get_submissions(cik, client=None, cache=None):
+    """Fetch a filer's submissions JSON through the shared HTTP cache"""
+    cache = cache or default_http_cache()
+    url = submissions_url(cik)
+    return cache.get_json(url, lambda conditional: _get(url, client, conditional))
+
+def cached_submissions(cik, client=None, cache=None):
+    """Submissions JSON from the cache regardless of its age, fetching only if never cached"""
+    cache = cache or default_http_cache()
+    body, _ = cache.load(submissions_url(cik))
+    if body is not None:
+        return json.loads(body)
+    return get_submissions(cik, client, cache)
+
+def _pick_info_table(items, primary_document):
+    """Choose the raw information table XML from a filing's directory listing"""
+    primary = os.path.basename(primary_document or '').lower()
+    candidates = [
+        item for item in items
+        if item.get('name', '').lower().endswith('.xml')
+        and item.get('type') != 'folder.gif'
+        and item['name'].lower() not in (primary, 'primary_doc.xml')
+    ]
+    if not candidates:
+        return None
+    
+    # Most filers use a name like form13fInfoTable.xml; otherwise the table is the largest XML
+    named = [item for item in candidates if 'infotable' in item['name'].lower() or 'informationtable' in item['name'].lower()]
+    if named:
+        return named[0]['name']
+    return max(candidates, key=lambda item: int(item.get('size') or 0))['name']
+
+def resolve_info_table_url(cik, filing, client=None, url_cache=None):
+    """Resolve the information table URL of a filing from its index.json
+    
+    Resolved URLs are stored in url_cache (keyed by accession number) so later
+    runs go straight to the document.
+    """
+    accession = filing['accessionNumber']
+    if url_cache is not None and accession in url_cache:
+        return url_cache[accession]
+    
+    filing_url = f"{SEC_ARCHIVES_URL}/{cik.lstrip('0')}/{accession.replace('-', '')}"
+    response = _get(f"{filing_url}/index.json", client)
+    response.raise_for_status()
+    items = response.json().get('directory', {}).get('item', [])
+    
+    name = _pick_info_table(items, filing.get('primaryDocument'))
+    if name is None:
+        return None
+    
+    url = f"{filing_url}/{name}"
+    if url_cache is not None:
+        url_cache[accession] = url
+    return url
+
+def load_url_cache(base_dir):
+    path = os.path.join(base_dir, INFO_TABLE_URL_CACHE)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable URL cache {path}: {e}")
+    return {}
+
+def save_url_cache(base_dir, url_cache):
+    with open(os.path.join(base_dir, INFO_TABLE_URL_CACHE), 'w', encoding='utf-8') as f:
+        json.dump(url_cache, f, indent=1, sort_keys=True)
+
+def _save_document(cik, accession, path, content, archive=None):
+    """Write a downloaded document to the archive, or atomically to path on disk"""
+    if archive is not None:
+        archive.put(cik, accession, os.path.basename(path), content)
+        return
+    
+    # Writing to a temporary file first means a crash never leaves a truncated filing behind
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.part", 'wb') as f:
+        f.write(content)
+    os.replace(f"{path}.part", path)
+
+def _download_cover_page(cik, filing, filing_dir, client, archive=None):
+    """Save a filing's raw primary_doc.xml cover page next to its information table"""
+    accession = filing['accessionNumber']
+    url = f"{SEC_ARCHIVES_URL}/{cik.lstrip('0')}/{accession.replace('-', '')}/{COVER_PAGE_FILE}"
+    try:
+        response = _get(url, client)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Error downloading cover page of {accession}: {e}")
+        default_metrics().record_failure('cover page', accession, e)
+        return False
+    
+    _save_document(cik, accession, os.path.join(filing_dir, COVER_PAGE_FILE), response.content, archive)
+    return True
+
+def download_filing(cik, filing, base_dir, client, url_cache=None, manifest=None, archive=None):
+    """Download the information table for a single filing"""
+    accession = filing['accessionNumber']
+    filing_dir = f"{base_dir}/filing_{accession}"
+    file_path = f"{filing_dir}/{INFO_TABLE_NAME}"
+    
+    try:
+        info_table_url = resolve_info_table_url(cik, filing, client, url_cache)
+        if info_table_url is None:
+            raise ValueError("No information table in filing index")
+        
+        response = _get(info_table_url, client)
+        response.raise_for_status()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Error downloading filing {accession}: {e}")
+        default_metrics().record_failure('download', accession, e)
+        if manifest is not None:
+            manifest.record_failure(cik, accession, e)
+        return False
+    
+    # Save the raw bytes so the XML declaration's encoding stays accurate
+    _save_document(cik, accession, file_path, response.content, archive)
+    
+    # The cover page says whether an amendment restates or adds holdings, and
+    # lists the other managers included in the report
+    has_cover_page = _download_cover_page(cik, filing, filing_dir, client, archive)
+    
+    if manifest is not None:
+        if has_cover_page:
+            manifest.record_download(cik, accession, file_path, response.content)
+        else:
+            # The information table is still parsed, but the filing stays pending so the next run fetches it again
+            manifest.record_failure(cik, accession, f"No cover page ({COVER_PAGE_FILE})")
+    
+    print(f"Downloaded filing {accession}")
+    return True
+
+def list_form13f_filings(cik, base_dir, client=None, cache=None, filings=None):
+    """A fund's 13F-HR filings as records, saving their metadata under base_dir
+    
+    filings, e.g. from the quarterly full index, replaces the submissions API lookup.
+    """
+    if filings is None:
+        data = get_submissions(cik, client, cache)
+        filings = pd.DataFrame(data['filings']['recent'])
+    
+    # Filter for Form 13F-HR
+    filtered_filings = filings[filings['form'].str.contains('13F-HR', na=False)]
+    save_filing_metadata(base_dir, filtered_filings)
+    return filtered_filings.to_dict('records')
+
+def pending_filings(cik, filings, manifest, archive=None):
+    """Filings the manifest has not seen downloaded yet"""
+    exists = (lambda path: archive.has(cik, *split_member_path(path))) if archive is not None else os.path.exists
+    pending = set(manifest.pending(cik, [filing['accessionNumber'] for filing in filings], exists))
+    skipped = len(filings) - len(pending)
+    if skipped:
+        print(f"Skipping {skipped} filings already in the manifest")
+    return [filing for filing in filings if filing['accessionNumber'] in pending]
+
+def download_form13f_files(cik, base_dir, client=None, max_workers=DOWNLOAD_WORKERS, manifest=None, cache=None, filings=None,
+                           archive=None):
+    """Download Form 13F files
+    
+    Filings are fetched concurrently by a bounded thread pool. Pass the same
+    client for every fund so the whole run stays under EDGAR's rate limit.
+    With a manifest, filings already downloaded are skipped and only new or
+    previously failed ones are fetched. filings, e.g. from the quarterly
+    full index, replaces the submissions API lookup. With an archive,
+    documents are stored compressed in it instead of one directory per filing.
+    """
     os.makedirs(base_dir, exist_ok=True)
     
     # Ensure CIK is padded to 10 digits
     cik = str(cik).zfill(10)
     
-    url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-    headers = {
-        "User-Agent": "YourCompany yourname@email.com"  # Replace with your details
-    }
+    if client is None:
+        client = default_sec_client()
     
     try:
-        response = requests.get(url, headers=headers)
-        data = response.json()
-        recent_filings = pd.DataFrame(data['filings']['recent'])
+        filings = list_form13f_filings(cik, base_dir, client, cache, filings)
+        if manifest is not None:
+            filings = pending_filings(cik, filings, manifest, archive)
         
-        # Filter for Form 13F-HR
-        filtered_filings = recent_filings[recent_filings['form'].str.contains('13F-HR', na=False)]
+        url_cache = load_url_cache(base_dir)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(lambda filing: download_filing(cik, filing, base_dir, client, url_cache, manifest, archive), filings))
+        finally:
+            save_url_cache(base_dir, url_cache)
         
-        for _, filing in filtered_filings.iterrows():
-            acc_no_clean = filing['accessionNumber'].replace('-', '')
-            filing_dir = f"{base_dir}/filing_{filing['accessionNumber']}"
-            os.makedirs(filing_dir, exist_ok=True)
-            
-            # Try all possible URL patterns
-            url_patterns = [
-                f"https://www.sec.gov/Archives/edgar/data/{cik.lstrip('0')}/{acc_no_clean}/xslForm13F_X02/form13fInfoTable.xml",
-                f"https://www.sec.gov/Archives/edgar/data/{cik.lstrip('0')}/{acc_no_clean}/form13fInfoTable.xml",
-                f"https://www.sec.gov/Archives/edgar/data/{cik.lstrip('0')}/{acc_no_clean}/infotable.xml",
-                # Add primary document URL pattern
-                f"https://www.sec.gov/Archives/edgar/data/{cik.lstrip('0')}/{acc_no_clean}/{filing['primaryDocument']}"
-            ]
-            
-            success = False
-            for url_pattern in url_patterns:
-                try:
-                    response = requests.get(url_pattern, headers=headers)
-                    response.raise_for_status()
-                    
-                    # If this is the primary document, try to extract the XML URL
-                    if url_pattern.endswith(filing['primaryDocument']):
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        for doc in soup.find_all('document'):
-                            if doc.type and 'XML' in str(doc.type):
-                                xml_file = doc.find('filename')
-                                if xml_file:
-                                    xml_url = f"https://www.sec.gov/Archives/edgar/data/{cik.lstrip('0')}/{acc_no_clean}/{xml_file.text}"
-                                    try:
-                                        response = requests.get(xml_url, headers=headers)
-                                        response.raise_for_status()
-                                        break
-                                    except:
-                                        continue
-                    
-                    # Save the successful response
-                    with open(f"{filing_dir}/form13fInfoTable.xml", 'w', encoding='utf-8') as f:
-                        f.write(response.text)
-                    
-                    print(f"Downloaded filing {filing['accessionNumber']}")
-                    success = True
-                    break
-                    
-                except requests.exceptions.RequestException:
-                    continue
-            
-            if not success:
-                print(f"Error downloading filing {filing['accessionNumber']}: Could not find valid URL")
-            
-            time.sleep(0.1)  # Respect SEC rate limits
+        print(f"Downloaded {sum(results)}/{len(filings)} filings ({client.summary()})")
+        return sum(results)
                 
     except Exception as e:
         print(f"Error fetching filings list: {str(e)}")
+        default_metrics().record_failure('list', cik, e)
+        return 0
 
-def scrape_form13f_tables(directory):
-    """Scrape Form 13F tables from downloaded XML files"""
-    all_holdings = []
-    
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.xml'):
-                file_path = os.path.join(root, file)
-                try:
-                    tree = ET.parse(file_path)
-                    root = tree.getroot()
-                    
-                    # Get filing accession number from file path
-                    accession_number = os.path.basename(os.path.dirname(file_path))
-                    
-                    # Find all informationTable entries
-                    namespace = {'ns': 'http://www.sec.gov/edgar/document/thirteenf/informationtable'}
-                    
-                    for entry in root.findall('.//ns:infoTable', namespace):
-                        holding = {
-                            'NAME OF ISSUER': entry.find('.//ns:nameOfIssuer', namespace).text.strip(),
-                            'TITLE OF CLASS': entry.find('.//ns:titleOfClass', namespace).text.strip(),
-                            'CUSIP': entry.find('.//ns:cusip', namespace).text.strip(),
-                            'VALUE (x$1000)': float(entry.find('.//ns:value', namespace).text.strip()),
-                            'SHRS OR PRN AMT': float(entry.find('.//ns:sshPrnamt', namespace).text.strip()),
-                            'SH/PRN': entry.find('.//ns:sshPrnamtType', namespace).text.strip(),
-                            'PUT/CALL': entry.find('.//ns:putCall', namespace).text.strip() if entry.find('.//ns:putCall', namespace) is not None else '',
-                            'INVESTMENT DISCRETION': entry.find('.//ns:investmentDiscretion', namespace).text.strip(),
-                            'OTHER MANAGER': entry.find('.//ns:otherManager', namespace).text.strip() if entry.find('.//ns:otherManager', namespace) is not None else '',
-                            'VOTING AUTHORITY SOLE': int(entry.find('.//ns:votingAuthority/ns:Sole', namespace).text.strip()),
-                            'VOTING AUTHORITY SHARED': int(entry.find('.//ns:votingAuthority/ns:Shared', namespace).text.strip()),
-                            'VOTING AUTHORITY NONE': int(entry.find('.//ns:votingAuthority/ns:None', namespace).text.strip()),
-                            'Filing Number': accession_number  # Changed from 'Filing Date'
-                        }
-                        all_holdings.append(holding)
-                        
-                except Exception as e:
-                    print(f"Error processing {file_path}: {str(e)}")
-                    continue
-    
-    if all_holdings:
-        df = pd.DataFrame(all_holdings)
-        
-        # Ensure all columns are present even if empty
-        required_columns = [
-            'NAME OF ISSUER', 'TITLE OF CLASS', 'CUSIP', 'VALUE (x$1000)', 
-            'SHRS OR PRN AMT', 'SH/PRN', 'PUT/CALL', 'INVESTMENT DISCRETION',
-            'OTHER MANAGER', 'VOTING AUTHORITY SOLE', 'VOTING AUTHORITY SHARED',
-            'VOTING AUTHORITY NONE', 'Filing Number'
-        ]
+def save_filing_metadata(base_dir, filings):
+    """Store per-accession filing metadata once, merged with what is already saved"""
+    path = os.path.join(base_dir, FILING_METADATA_FILE)
+    metadata = filings[[col for col in FILING_METADATA_COLUMNS if col in filings.columns]]
+    existing = load_filing_metadata(base_dir)
+    if not existing.empty:
+        metadata = pd.concat([metadata, existing]).drop_duplicates('accessionNumber', keep='first')
+    metadata.to_csv(path, index=False)
+
+def load_filing_metadata(base_dir):
+    path = os.path.join(base_dir, FILING_METADATA_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_csv(path, dtype=str)
+
+def attach_filing_dates(df, metadata, cover_pages=None):
+    """Add Filing Date and Report Date columns looked up by accession number
+    
+    Lookups are done once per distinct filing and broadcast to rows through
+    categorical codes. Filings whose metadata has no report date, such as
+    those listed from the full index, take the period from their cover page
+    in cover_pages ({Filing Number: fields}) when it is known.
+    """
+    filing_numbers = df['Filing Number'].astype('category')
+    codes = filing_numbers.cat.codes.to_numpy()
+    accessions = filing_numbers.cat.categories.str.replace('filing_', '', n=1)
+    
+    if metadata.empty:
+        metadata = pd.DataFrame(columns=FILING_METADATA_COLUMNS)
+    by_accession = metadata.drop_duplicates('accessionNumber').set_index('accessionNumber').reindex(accessions)
+    if 'reportDate' not in by_accession.columns:
+        by_accession['reportDate'] = None
+    if cover_pages:
+        periods = [report_period(cover_pages.get(number, {}).get('reportCalendarOrQuarter'))
+                   for number in filing_numbers.cat.categories]
+        by_accession['reportDate'] = by_accession['reportDate'].fillna(pd.Series(periods, index=by_accession.index))
+    
+    for column, source in [('Filing Date', 'filingDate'), ('Report Date', 'reportDate'), ('Form', 'form')]:
+        per_filing = by_accession[source].to_numpy() if source in by_accession.columns else np.full(len(accessions), None)
+        df[column] = pd.Categorical(per_filing[codes])
+    
+    missing = by_accession.index[by_accession['reportDate'].isna()]
+    if len(missing):
+        print(f"No report date for {len(missing)} filings; it is left empty")
+    return df
+
+def _read_cover_fields(directory, filing_number, archive=None, cik=None):
+    empty = dict.fromkeys(COVER_PAGE_FIELDS, '')
+    path = os.path.join(directory, filing_number, COVER_PAGE_FILE)
+    if archive is None:
+        return read_cover_page(path) if os.path.exists(path) else empty
+    accession = filing_number.replace('filing_', '', 1)
+    if not archive.has(cik, accession, COVER_PAGE_FILE):
+        return empty
+    with archive.open(cik, accession, COVER_PAGE_FILE) as stream:
+        return read_cover_page(stream)
+
+def read_cover_pages(filing_numbers, directory, archive=None, cik=None):
+    """{Filing Number: cover page fields} for each distinct filing, fields all '' when it has no cover page"""
+    cover_pages = {}
+    for filing_number in pd.unique(np.asarray(filing_numbers, dtype=object)):
+        path = os.path.join(directory, filing_number, COVER_PAGE_FILE)
+        try:
+            cover_pages[filing_number] = _read_cover_fields(directory, filing_number, archive, cik)
+        except ET.ParseError as e:
+            print(f"Error reading {path}: {e}")
+            default_metrics().record_failure('cover page', path, e)
+            cover_pages[filing_number] = dict.fromkeys(COVER_PAGE_FIELDS, '')
+    return cover_pages
+
+def attach_amendment_types(df, cover_pages):
+    """Add an Amendment Type column from the filings' cover pages"""
+    filing_numbers = df['Filing Number'].astype('category')
+    types = [cover_pages.get(number, {}).get('amendmentType', '') for number in filing_numbers.cat.categories]
+    df['Amendment Type'] = pd.Categorical(np.asarray(types, dtype=object)[filing_numbers.cat.codes.to_numpy()])
+    return df
+
+def collect_parsed(results, manifest=None, cik=None):
+    """Merge parse results into column buffers, recording each filing's outcome"""
+    columns = empty_columns()
+    metrics = default_metrics()
+    for file_path, file_columns, count, error, seconds in results:
+        accession_number = os.path.basename(os.path.dirname(file_path)).replace('filing_', '', 1)
+        metrics.record_parse(file_path, count, seconds, error)
+        if error is not None:
+            print(f"Error processing {file_path}: {error}")
+            if manifest is not None and cik is not None:
+                manifest.record_parse(cik, accession_number, error=error)
+            continue
         
-        for col in required_columns:
-            if col not in df.columns:
-                df[col] = ''
+        merge_columns(columns, file_columns)
+        if manifest is not None and cik is not None:
+            manifest.record_parse(cik, accession_number, count)
+    return columns
+
+def holdings_frame(columns, directory, archive=None, cik=None):
+    if not columns['Filing Number']:
+        return pd.DataFrame()
+    
+    with default_metrics().timed('holdings frame'):
+        df = pd.DataFrame(columns, columns=HOLDING_COLUMNS)
+        cover_pages = read_cover_pages(df['Filing Number'], directory, archive, cik)
+        df = attach_filing_dates(df, load_filing_metadata(directory), cover_pages)
+        df = attach_amendment_types(df, cover_pages)
         
-        # Reorder columns
-        df = df[required_columns]
+        # Amendments are combined with their originals here; the raw filings stay archived
+        df = reconcile_amendments(df)
         
         # Save to CSV in the fund's directory
         csv_path = os.path.join(directory, 'form13f_holdings.csv')
         df.to_csv(csv_path, index=False)
-        return df
+    return df
+
+def scrape_form13f_tables(directory, manifest=None, cik=None, workers=1, archive=None):
+    """Scrape Form 13F tables from downloaded XML files
+    
+    Each file is stream-parsed into column buffers, across a process pool
+    when workers > 1. With a manifest and CIK, the parse outcome of every
+    filing is recorded. With an archive, the fund's filings are read from
+    it instead of from directory.
+    """
+    if archive is not None:
+        cik = str(cik or os.path.basename(directory).replace('fund_', '', 1)).zfill(10)
+        tasks = [(cik, path) for path in archive.paths(directory, cik)]
+        results = parse_files(tasks, workers, archive_path=archive.path)
     else:
-        return pd.DataFrame()
+        results = parse_files(find_info_tables(directory), workers)
+    columns = collect_parsed(results, manifest, cik)
+    return holdings_frame(columns, directory, archive, cik)
 
-def get_fund_relationships(ciks):
-    """Get fund relationships from SEC data"""
-    relationships = {}
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
+def parse_filing_tree(base_dir, workers=None, manifest=None, archive=None):
+    """Re-parse every downloaded filing under base_dir in one process pool
+    
+    Files from all fund_<cik> directories are parsed together so the pool
+    stays busy across funds. With an archive, the filings are listed from it
+    in one query instead of walking the tree. Returns {cik: holdings DataFrame}.
+    """
+    if archive is not None:
+        ciks = archive.ciks()
+        fund_dirs = [os.path.join(base_dir, f"fund_{cik}") for cik in ciks]
+        file_paths = [(cik, path) for cik, fund_dir in zip(ciks, fund_dirs) for path in archive.paths(fund_dir, cik)]
+        results = parse_files(file_paths, workers, archive_path=archive.path)
+    else:
+        fund_dirs = sorted(
+            os.path.join(base_dir, name) for name in os.listdir(base_dir)
+            if name.startswith('fund_') and os.path.isdir(os.path.join(base_dir, name))
+        )
+        file_paths = [path for fund_dir in fund_dirs for path in find_info_tables(fund_dir)]
+        results = parse_files(file_paths, workers)
+    print(f"Parsing {len(file_paths)} filings from {len(fund_dirs)} funds with {workers or os.cpu_count()} workers")
+    
+    results_by_fund = {fund_dir: [] for fund_dir in fund_dirs}
+    for result in results:
+        fund_dir = os.path.dirname(os.path.dirname(result[0]))
+        results_by_fund[fund_dir].append(result)
+    
+    holdings = {}
+    for fund_dir, results in results_by_fund.items():
+        cik = os.path.basename(fund_dir).replace('fund_', '', 1)
+        holdings[cik] = holdings_frame(collect_parsed(results, manifest, cik), fund_dir, archive, cik)
+    return holdings
+
+def build_relationship_graph(ciks, client=None, cache=None, base_dir='filling', archive=None):
+    """Graph of affiliated filers from cached submissions JSON and saved 13F cover pages
+    
+    Names, former names and filer agents come from each CIK's submissions
+    document, read from the HTTP cache even when stale, so CIKs the scraper
+    has already seen cost no requests. Other included managers come from
+    the cover pages under base_dir.
+    """
+    graph = RelationshipGraph()
+    for cik in ciks:
+        cik = str(cik).zfill(10)
+        try:
+            data = cached_submissions(cik, client, cache)
+        except (requests.exceptions.RequestException, LookupError, ValueError) as e:
+            print(f"Error fetching CIK {cik}: {e}")
+            default_metrics().record_failure('submissions', cik, e)
+            graph.add_filer(cik, '')
+            continue
         
-        for cik in ciks:
-            # Ensure CIK is padded to 10 digits
-            padded_cik = str(cik).zfill(10)
-            url = f"https://data.sec.gov/submissions/CIK{padded_cik}.json"
-            
-            print(f"Fetching data for CIK: {cik}")  # Debug print
-            response = requests.get(url, headers=headers)
-            
-            if response.status_code != 200:
-                print(f"Error fetching CIK {cik}: Status {response.status_code}")
-                continue
-                
-            data = response.json()
-            
-            # Get company name and add to relationships
-            company_name = data.get('name', '')
-            relationships[cik] = {
-                'name': company_name,
-                'related_ciks': {cik}  # Start with self as related
-            }
-            
-            time.sleep(0.1)  # Respect SEC rate limits
-            
-    except Exception as e:
-        print(f"Error in get_fund_relationships: {e}")
+        former_names = [former.get('name', '') for former in data.get('formerNames', [])]
+        accessions = data.get('filings', {}).get('recent', {}).get('accessionNumber', [])
+        graph.add_filer(cik, data.get('name', ''), former_names, {accession_filer(acc) for acc in accessions})
     
-    return relationships
+    cover_pages = add_cover_pages(graph, base_dir, archive)
+    graph.link_shared_names()
+    graph.link_filer_agents()
+    print(f"Built relationship graph of {len(graph.edges)} filers from {cover_pages} cover pages")
+    return graph
+
+def get_fund_relationships(ciks, client=None, cache=None, base_dir='filling'):
+    """Group funds by parent manager: {parent_cik: {'name': ..., 'related_ciks': {...}}}"""
+    return build_relationship_graph(ciks, client, cache, base_dir).relationships()
 
-def organize_files_by_parent(base_dir):
+def organize_files_by_parent(base_dir, ciks=None, cache=None):
     """Reorganize files by parent company"""
-    relationships = get_fund_relationships()
+    if ciks is None:
+        ciks = [name.replace('fund_', '', 1) for name in sorted(os.listdir(base_dir)) if name.startswith('fund_')]
+    relationships = get_fund_relationships(ciks, cache=cache, base_dir=base_dir)
     
     for parent_cik, info in relationships.items():
         parent_name = info['name'].replace(' ', '_')
@@ -0,0 +1,219 @@
+import os
+import xml.etree.ElementTree as ET
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+from amendments import COVER_PAGE_FILE
+from cik_finder import normalize_name
+
+DEFAULT_RELATIONSHIPS_PATH = os.path.join('filling', 'fund_relationships.csv')
+
+OTHER_MANAGER = 'other manager'
+FORMER_NAME = 'former name'
+FILER_AGENT = 'filer agent'
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def read_other_managers(path):
+    """Other managers listed on a 13F cover page or summary page
+
+    Returns dicts with cik, file_number and name ('' when absent), from
+    both otherManagersInfo and otherManagers2Info.
+    """
+    managers = []
+    for _, elem in ET.iterparse(path):
+        if _local_name(elem.tag) == 'otherManager':
+            fields = {_local_name(child.tag): (child.text or '').strip() for child in elem}
+            managers.append({
+                'cik': fields.get('cik', ''),
+                'file_number': fields.get('form13FFileNumber', ''),
+                'name': fields.get('name', ''),
+            })
+            elem.clear()
+    return managers
+
+
+def accession_filer(accession_number):
+    """CIK of whoever submitted a filing, encoded in its accession number prefix"""
+    return str(accession_number).split('-', 1)[0].zfill(10)
+
+
+class RelationshipGraph:
+    """Undirected graph of affiliated filers
+
+    Nodes are CIKs (or 13F file numbers for other managers filed without
+    a CIK). Edges record why two filers are related: one listed the other
+    as an included manager, they share a current or former name, or one
+    submitted the other's filings as its filer agent. Each connected
+    component is one parent group.
+    """
+
+    def __init__(self):
+        self.names = {}
+        self.former_names = defaultdict(set)
+        self.filer_agents = defaultdict(set)
+        self.tracked = set()
+        self.edges = defaultdict(dict)
+        # Times a node reported for or filed on behalf of another filer
+        self.parent_votes = Counter()
+
+    def add_filer(self, cik, name, former_names=(), filer_agents=(), tracked=True):
+        cik = str(cik).zfill(10)
+        if name:
+            self.names[cik] = name
+        self.former_names[cik].update(name for name in former_names if name)
+        self.filer_agents[cik].update(agent for agent in filer_agents if agent != cik)
+        self.edges.setdefault(cik, {})
+        if tracked:
+            self.tracked.add(cik)
+
+    def add_edge(self, a, b, reason):
+        if a == b:
+            return
+        self.edges[a].setdefault(b, reason)
+        self.edges[b].setdefault(a, reason)
+
+    def add_other_managers(self, cik, managers):
+        """Link a filer to the other managers on its cover pages"""
+        cik = str(cik).zfill(10)
+        for manager in managers:
+            node = manager['cik'].zfill(10) if manager['cik'].isdigit() else manager['file_number']
+            if not node:
+                continue
+            if node not in self.names and manager['name']:
+                self.names[node] = manager['name']
+            self.add_edge(cik, node, OTHER_MANAGER)
+            self.parent_votes[cik] += 1
+
+    def link_shared_names(self):
+        """Link filers whose current or former names normalize to the same name"""
+        by_name = defaultdict(set)
+        for node in self.edges:
+            for name in {self.names.get(node, '')} | self.former_names[node]:
+                if name:
+                    by_name[normalize_name(name)].add(node)
+        for nodes in by_name.values():
+            first, *rest = sorted(nodes)
+            for node in rest:
+                self.add_edge(first, node, FORMER_NAME)
+
+    def link_filer_agents(self):
+        """Link filers whose filings were submitted by another filer in the graph
+
+        Commercial filing agents submit for thousands of unrelated managers,
+        so only agents that are themselves part of the graph count.
+        """
+        for node, agents in list(self.filer_agents.items()):
+            for agent in agents:
+                if agent in self.edges:
+                    self.add_edge(node, agent, FILER_AGENT)
+                    self.parent_votes[agent] += 1
+
+    def components(self):
+        """Connected components as lists of nodes"""
+        seen = set()
+        components = []
+        for start in sorted(self.edges):
+            if start in seen:
+                continue
+            component, stack = [], [start]
+            seen.add(start)
+            while stack:
+                node = stack.pop()
+                component.append(node)
+                for other in self.edges[node]:
+                    if other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+            components.append(sorted(component))
+        return components
+
+    def _parent(self, component):
+        # The filer that reports for or files on behalf of the most affiliates is the parent
+        return min(component, key=lambda node: (
+            -self.parent_votes[node], -len(self.edges[node]), node not in self.tracked, node
+        ))
+
+    def parents(self):
+        """Parent node of every node"""
+        parents = {}
+        for component in self.components():
+            parent = self._parent(component)
+            parents.update(dict.fromkeys(component, parent))
+        return parents
+
+    def relationships(self):
+        """{parent: {'name': parent name, 'related_ciks': set of tracked CIKs}} per group with tracked filers"""
+        relationships = {}
+        for component in self.components():
+            tracked = {node for node in component if node in self.tracked}
+            if tracked:
+                parent = self._parent(component)
+                relationships[parent] = {'name': self.names.get(parent, parent), 'related_ciks': tracked}
+        return relationships
+
+    def to_frame(self):
+        """One row per node with its parent and the reasons it is linked"""
+        parents = self.parents()
+        rows = []
+        for node in sorted(self.edges):
+            parent = parents[node]
+            rows.append({
+                'CIK': node,
+                'Name': self.names.get(node, ''),
+                'Tracked': node in self.tracked,
+                'Parent CIK': parent,
+                'Parent Name': self.names.get(parent, parent),
+                'Former Names': '; '.join(sorted(self.former_names[node])),
+                'Links': '; '.join(f"{other} ({reason})" for other, reason in sorted(self.edges[node].items())),
+            })
+        return pd.DataFrame(rows, columns=['CIK', 'Name', 'Tracked', 'Parent CIK', 'Parent Name', 'Former Names', 'Links'])
+
+
+def add_cover_pages(graph, base_dir, archive=None):
+    """Add other-manager links from every cover page saved under base_dir/fund_<cik> or in archive"""
+    read = 0
+    if archive is not None:
+        for cik, accession in archive.documents(name=COVER_PAGE_FILE):
+            try:
+                with archive.open(cik, accession, COVER_PAGE_FILE) as stream:
+                    graph.add_other_managers(cik, read_other_managers(stream))
+                read += 1
+            except ET.ParseError as e:
+                print(f"Error reading cover page of {accession}: {e}")
+        return read
+
+    for name in sorted(os.listdir(base_dir)) if os.path.isdir(base_dir) else []:
+        fund_dir = os.path.join(base_dir, name)
+        if not name.startswith('fund_') or not os.path.isdir(fund_dir):
+            continue
+        cik = name.replace('fund_', '', 1)
+        for filing in os.listdir(fund_dir):
+            path = os.path.join(fund_dir, filing, COVER_PAGE_FILE)
+            if not os.path.exists(path):
+                continue
+            try:
+                graph.add_other_managers(cik, read_other_managers(path))
+                read += 1
+            except ET.ParseError as e:
+                print(f"Error reading {path}: {e}")
+    return read
+
+
+def save_relationships(graph, path=DEFAULT_RELATIONSHIPS_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    graph.to_frame().to_csv(path, index=False)
+
+
+def load_parent_names(path=DEFAULT_RELATIONSHIPS_PATH):
+    """{CIK: parent manager name} from a saved relationships file"""
+    if not os.path.exists(path):
+        return {}
+    frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return dict(zip(frame['CIK'], frame['Parent Name']))
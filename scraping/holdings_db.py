@@ -0,0 +1,248 @@
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from holdings_store import DEFAULT_STORE_DIR, parse_dates, read_holdings
+from run_report import default_metrics
+
+DEFAULT_DB_PATH = os.path.join('filling', 'holdings.sqlite')
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'src', 'db', 'schema.sql')
+BATCH_SIZE = 5000
+# Filing IDs per IN (...) lookup, well under SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+# Secondary indexes the backend queries by; built after bulk loads instead of maintained row by row
+SECONDARY_INDEXES = {
+    'idx_holdings_filing_id': 'holdings (filing_id)',
+    'idx_holdings_cusip': 'holdings (cusip)',
+}
+
+# Holdings table column for each scraper column
+HOLDING_FIELDS = [
+    ('name_of_issuer', 'NAME OF ISSUER'),
+    ('title_of_class', 'TITLE OF CLASS'),
+    ('cusip', 'CUSIP'),
+    ('value', 'VALUE (x$1000)'),
+    ('shares', 'SHRS OR PRN AMT'),
+    ('share_type', 'SH/PRN'),
+    ('put_call', 'PUT/CALL'),
+    ('investment_discretion', 'INVESTMENT DISCRETION'),
+    ('other_manager', 'OTHER MANAGER'),
+    ('voting_authority_sole', 'VOTING AUTHORITY SOLE'),
+    ('voting_authority_shared', 'VOTING AUTHORITY SHARED'),
+    ('voting_authority_none', 'VOTING AUTHORITY NONE'),
+]
+FIELD_KINDS = {
+    'value': 'float', 'shares': 'float',
+    'voting_authority_sole': 'int', 'voting_authority_shared': 'int', 'voting_authority_none': 'int',
+}
+
+
+def sqlite_schema(path=SCHEMA_PATH):
+    """The backend's MySQL schema rewritten for SQLite"""
+    with open(path, 'r', encoding='utf-8') as f:
+        sql = f.read()
+    sql = re.sub(r'\bINT PRIMARY KEY AUTO_INCREMENT\b', 'INTEGER PRIMARY KEY AUTOINCREMENT', sql)
+    return re.sub(r'\bUNIQUE KEY \w+ \(', 'UNIQUE (', sql)
+
+
+def _values(df, column, kind=None):
+    """A column as a list of Python values with None for missing ones"""
+    if column not in df.columns:
+        return [None] * len(df)
+    values = df[column]
+    if kind == 'float':
+        values = pd.to_numeric(values, errors='coerce').astype('float64')
+    elif kind == 'int':
+        values = pd.to_numeric(values, errors='coerce').round().astype('Int64')
+    else:
+        values = values.astype(object)
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def _dates(df, column):
+    if column not in df.columns:
+        return [None] * len(df)
+    dates = parse_dates(df[column])
+    return dates.dt.strftime('%Y-%m-%d').astype(object).where(dates.notna(), None).tolist()
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class HoldingsLoader:
+    """Batched loader of parsed holdings into the backend's filings_metadata, filings and holdings tables
+
+    Each fund is loaded in one transaction: filings are upserted on their
+    unique keys and holdings are inserted with executemany in batches of
+    batch_size. Reloading a filing replaces its holdings, so loads are
+    idempotent. SQLite stands in for the backend's MySQL database.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=BATCH_SIZE, schema_path=SCHEMA_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("PRAGMA journal_mode = WAL; PRAGMA synchronous = NORMAL;" + sqlite_schema(schema_path))
+        self._deferred = False
+        self.filings = 0
+        self.rows = 0
+        self.seconds = 0.0
+
+    def _create_indexes(self):
+        for name, target in SECONDARY_INDEXES.items():
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+        self._conn.execute("ANALYZE")
+        self._conn.commit()
+
+    def begin_bulk(self, defer_indexes=None):
+        """Drop the secondary indexes until end_bulk, for large loads
+
+        By default they are only deferred when holdings is empty, i.e. for a
+        backfill; on a populated table, rebuilding them costs more than
+        maintaining them for an incremental run.
+        """
+        with self._lock:
+            if defer_indexes is None:
+                defer_indexes = self._conn.execute("SELECT 1 FROM holdings LIMIT 1").fetchone() is None
+            if defer_indexes:
+                for name in SECONDARY_INDEXES:
+                    self._conn.execute(f"DROP INDEX IF EXISTS {name}")
+                self._conn.commit()
+            else:
+                self._create_indexes()
+            self._deferred = defer_indexes
+
+    def end_bulk(self):
+        """Build any deferred secondary indexes"""
+        with self._lock:
+            if self._deferred:
+                start = time.perf_counter()
+                self._create_indexes()
+                print(f"Built {len(SECONDARY_INDEXES)} holdings indexes in {time.perf_counter() - start:.1f}s")
+                self._deferred = False
+
+    def _filing_ids(self, filing_ids):
+        ids = {}
+        for chunk in _chunks(filing_ids, LOOKUP_CHUNK):
+            placeholders = ', '.join('?' * len(chunk))
+            ids.update(self._conn.execute(
+                f"SELECT filing_id, id FROM filings WHERE filing_id IN ({placeholders})", chunk
+            ).fetchall())
+        return ids
+
+    def load(self, holdings_df, cik):
+        """Upsert one fund's filings and replace their holdings; returns the number of holdings rows loaded"""
+        if holdings_df.empty:
+            return 0
+        cik = str(cik).zfill(10)
+        start = time.perf_counter()
+
+        accessions = holdings_df['Filing Number'].astype(str).str.replace('filing_', '', n=1)
+        per_filing = holdings_df.assign(_accession=accessions.to_numpy()).drop_duplicates('_accession')
+        filing_dates = _dates(per_filing, 'Filing Date')
+        report_dates = _dates(per_filing, 'Report Date')
+        forms = _values(per_filing, 'Form')
+
+        metadata, filings = [], []
+        for accession, filed, reported, form in zip(per_filing['_accession'], filing_dates, report_dates, forms):
+            if reported is not None and filed is not None:
+                metadata.append((cik, accession, filed, reported, form or '13F-HR'))
+            # filings.filing_date is required; the period end is the best stand-in for an unknown filing date
+            filing_date = filed or reported
+            if filing_date is not None:
+                filings.append((accession, filing_date, cik))
+        skipped = len(per_filing) - len(filings)
+        if skipped:
+            print(f"Not loading {skipped} filings of CIK {cik} with neither a filing nor a report date")
+
+        columns = [_values(holdings_df, column, FIELD_KINDS.get(field)) for field, column in HOLDING_FIELDS]
+        rows = list(zip(accessions, *columns))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO filings_metadata (cik, accession_number, filing_date, report_date, form) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (cik, accession_number) DO UPDATE SET "
+                "filing_date = excluded.filing_date, report_date = excluded.report_date, form = excluded.form",
+                metadata
+            )
+
+            # Reloaded filings keep their row ID; their old holdings are replaced below
+            existing = self._filing_ids([filing[0] for filing in filings])
+            self._conn.executemany(
+                "INSERT INTO filings (filing_id, filing_date, cik) VALUES (?, ?, ?) "
+                "ON CONFLICT (filing_id) DO UPDATE SET filing_date = excluded.filing_date, cik = excluded.cik",
+                filings
+            )
+            self._conn.executemany("DELETE FROM holdings WHERE filing_id = ?", [(id_,) for id_ in existing.values()])
+
+            ids = self._filing_ids([filing[0] for filing in filings])
+            names = ', '.join(['filing_id'] + [field for field, _ in HOLDING_FIELDS])
+            insert = f"INSERT INTO holdings ({names}) VALUES ({', '.join('?' * (len(HOLDING_FIELDS) + 1))})"
+            loaded = 0
+            for batch in _chunks(rows, self.batch_size):
+                batch = [(ids[row[0]], *row[1:]) for row in batch if row[0] in ids]
+                self._conn.executemany(insert, batch)
+                loaded += len(batch)
+
+        elapsed = time.perf_counter() - start
+        self.filings += len(filings)
+        self.rows += loaded
+        self.seconds += elapsed
+        default_metrics().add_time('db load', elapsed)
+        return loaded
+
+    def counts(self):
+        with self._lock:
+            return {table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ['filings_metadata', 'filings', 'holdings']}
+
+    def summary(self):
+        rate = self.rows / self.seconds if self.seconds else 0
+        return f"{self.rows} holdings from {self.filings} filings loaded into {self.path} at {rate:,.0f} rows/s"
+
+    def close(self):
+        """Build deferred indexes and close the database"""
+        self.end_bulk()
+        with self._lock:
+            self._conn.close()
+
+
+def load_store(loader, root=DEFAULT_STORE_DIR):
+    """Load every fund in the Parquet holdings store, one fund at a time"""
+    if not os.path.isdir(root):
+        return 0
+    ciks = sorted(name.split('=', 1)[1] for name in os.listdir(root) if name.startswith('CIK='))
+    for cik in ciks:
+        holdings_df = read_holdings(root, cik=cik)
+        print(f"CIK {cik}: {loader.load(holdings_df, cik)} holdings")
+    return len(ciks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load the Parquet holdings store into the backend's schema")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH)
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--defer-indexes', action='store_true',
+                        help="Drop and rebuild the secondary indexes even if holdings is not empty")
+    args = parser.parse_args()
+
+    loader = HoldingsLoader(args.db, args.batch_size)
+    loader.begin_bulk(True if args.defer_indexes else None)
+    funds = load_store(loader, args.store)
+    print(f"Loaded {funds} funds: {loader.summary()}")
+    print(loader.counts())
+    loader.close()
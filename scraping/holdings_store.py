@@ -0,0 +1,135 @@
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+DEFAULT_STORE_DIR = os.path.join('filling', 'holdings')
+
+CATEGORICAL_COLUMNS = [
+    'NAME OF ISSUER', 'TITLE OF CLASS', 'CUSIP', 'SH/PRN', 'PUT/CALL',
+    'INVESTMENT DISCRETION', 'OTHER MANAGER', 'Filing Number', 'Fund Name'
+]
+INTEGER_COLUMNS = [
+    'SHRS OR PRN AMT', 'VOTING AUTHORITY SOLE', 'VOTING AUTHORITY SHARED', 'VOTING AUTHORITY NONE'
+]
+FLOAT_COLUMNS = ['VALUE (x$1000)']
+DATE_COLUMNS = ['Filing Date', 'Report Date']
+ID_COLUMNS = ['Security ID']
+
+# Hive-style directories: <root>/CIK=0001273087/Quarter=2023Q4/part-0.parquet
+PARTITIONING = ds.partitioning(pa.schema([('CIK', pa.string()), ('Quarter', pa.string())]), flavor='hive')
+
+
+def parse_dates(values):
+    """Parse a column of date strings, which may be categorical, to datetime64
+
+    to_datetime hands a categorical back as a categorical once it is long
+    enough to use its cache, so categories are parsed as plain values.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = pd.Series(np.asarray(values, dtype=object), index=values.index, name=values.name)
+    return pd.to_datetime(values, errors='coerce', cache=True)
+
+
+def normalize_dtypes(df):
+    """Cast holdings columns to compact, typed representations"""
+    df = df.copy()
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    for col in INTEGER_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+    for col in ID_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('int32')
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_dates(df[col])
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna('').astype(str).astype('category')
+    return df
+
+
+def report_quarter(df):
+    """Quarter label (e.g. 2023Q4) for each row, from the report date when known"""
+    for col in ['Report Date', 'Filing Date']:
+        if col in df.columns:
+            dates = parse_dates(df[col])
+            return dates.dt.to_period('Q').astype(str).where(dates.notna(), 'unknown')
+    return pd.Series('unknown', index=df.index)
+
+
+def write_holdings(df, cik, root=DEFAULT_STORE_DIR):
+    """Write one fund's holdings into the dataset, replacing everything stored for the fund
+
+    The fund's whole CIK= directory is cleared first, so a filing that moved
+    to another quarter (e.g. once its report date became known) is not left
+    behind in its old partition.
+    """
+    if df.empty:
+        return
+    cik = str(cik).zfill(10)
+    df = normalize_dtypes(df.drop(columns=['CIK'], errors='ignore'))
+    df['CIK'] = cik
+    df['Quarter'] = report_quarter(df)
+    shutil.rmtree(os.path.join(root, f"CIK={cik}"), ignore_errors=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        table, root,
+        format='parquet',
+        partitioning=PARTITIONING,
+        existing_data_behavior='overwrite_or_ignore',
+        basename_template='part-{i}.parquet'
+    )
+
+
+def read_holdings(root=DEFAULT_STORE_DIR, cik=None, quarter=None, columns=None):
+    """Load holdings, reading only the partitions and columns asked for"""
+    if not os.path.isdir(root):
+        return pd.DataFrame()
+    dataset = ds.dataset(root, format='parquet', partitioning=PARTITIONING)
+
+    filters = []
+    if cik is not None:
+        filters.append(ds.field('CIK') == str(cik).zfill(10))
+    if quarter is not None:
+        filters.append(ds.field('Quarter') == str(quarter))
+    expression = None
+    for condition in filters:
+        expression = condition if expression is None else expression & condition
+
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def migrate_csvs(base_dir='filling', root=DEFAULT_STORE_DIR):
+    """One-shot conversion of every fund_<cik>/form13f_holdings.csv into the dataset"""
+    migrated = 0
+    for name in sorted(os.listdir(base_dir)):
+        csv_path = os.path.join(base_dir, name, 'form13f_holdings.csv')
+        if not name.startswith('fund_') or not os.path.exists(csv_path):
+            continue
+        cik = name.replace('fund_', '', 1)
+        try:
+            df = pd.read_csv(csv_path, dtype={'CIK': str})
+            write_holdings(df, cik, root)
+            migrated += 1
+            print(f"Migrated {csv_path} ({len(df)} rows)")
+        except Exception as e:
+            print(f"Error migrating {csv_path}: {e}")
+    print(f"Migrated {migrated} funds into {root}")
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate per-fund holdings CSVs into the Parquet store")
+    parser.add_argument('--base-dir', default='filling')
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR)
+    args = parser.parse_args()
+    migrate_csvs(args.base_dir, args.store)
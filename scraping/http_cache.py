@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join('filling', 'http_cache')
+DEFAULT_TTL = 6 * 60 * 60  # Seconds a cached response is served without revalidating
+
+
+def _write_atomic(path, data):
+    """Write bytes through a temporary file of its own, so concurrent writers of one path never share it"""
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=os.path.basename(path),
+                                     suffix='.part', delete=False) as f:
+        f.write(data)
+    try:
+        os.replace(f.name, path)
+    except OSError:
+        os.remove(f.name)
+        raise
+
+
+class HttpCache:
+    """On-disk HTTP response cache that revalidates with ETag/Last-Modified
+
+    Each URL is stored as a body file plus a small JSON file with its
+    validators. Within the TTL the cached body is returned without any
+    request; after it a conditional request is sent and a 304 reuses the
+    body. In offline mode only cached snapshots are served.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, offline=False):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{key}.body"), os.path.join(self.directory, f"{key}.meta.json")
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def load(self, url):
+        """Return (body, meta) for a cached URL, or (None, None)"""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                return f.read(), meta
+        except (OSError, ValueError):
+            return None, None
+
+    def store(self, url, body, etag=None, last_modified=None):
+        body_path, meta_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time()
+        }
+        # Write the body before the metadata so a reader never sees validators without a body
+        _write_atomic(body_path, body)
+        _write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def get(self, url, fetch):
+        """Return the body for url, calling fetch(headers) only when needed
+
+        fetch receives the conditional request headers and must return a
+        requests-style response.
+        """
+        body, meta = self.load(url)
+
+        if body is not None and (self.offline or time.time() - meta['fetched_at'] < self.ttl):
+            self._count('hits')
+            return body
+        if self.offline:
+            raise LookupError(f"{url} is not in the offline HTTP cache")
+
+        conditional = {}
+        if body is not None:
+            if meta.get('etag'):
+                conditional['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                conditional['If-Modified-Since'] = meta['last_modified']
+
+        response = fetch(conditional)
+        if response.status_code == 304 and body is not None:
+            self._count('revalidated')
+            self.store(url, body, meta.get('etag'), meta.get('last_modified'))
+            return body
+
+        response.raise_for_status()
+        self._count('misses')
+        self.store(url, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response.content
+
+    def get_json(self, url, fetch):
+        return json.loads(self.get(url, fetch))
+
+    def stats(self):
+        return {'hits': self.hits, 'revalidated': self.revalidated, 'misses': self.misses}
+
+    def summary(self):
+        return f"{self.hits} hits, {self.revalidated} revalidated, {self.misses} misses"
@@ -0,0 +1,163 @@
+import functools
+import os
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+from amendments import COVER_PAGE_FILE
+from filing_archive import FilingArchive, split_member_path
+
+# Output column for each leaf element of an infoTable entry, with its type conversion
+FIELDS = {
+    'nameOfIssuer': ('NAME OF ISSUER', str),
+    'titleOfClass': ('TITLE OF CLASS', str),
+    'cusip': ('CUSIP', str),
+    'value': ('VALUE (x$1000)', float),
+    'sshPrnamt': ('SHRS OR PRN AMT', float),
+    'sshPrnamtType': ('SH/PRN', str),
+    'putCall': ('PUT/CALL', str),
+    'investmentDiscretion': ('INVESTMENT DISCRETION', str),
+    'otherManager': ('OTHER MANAGER', str),
+    'Sole': ('VOTING AUTHORITY SOLE', int),
+    'Shared': ('VOTING AUTHORITY SHARED', int),
+    'None': ('VOTING AUTHORITY NONE', int),
+}
+
+# Optional elements default to an empty string; every other field is required
+OPTIONAL_FIELDS = {'putCall', 'otherManager'}
+
+# Files handed to each worker at a time; small filings are cheap, so batch them
+PARSE_CHUNKSIZE = 8
+
+HOLDING_COLUMNS = [column for column, _ in FIELDS.values()] + ['Filing Number']
+
+
+def empty_columns():
+    """Column buffers for parsed holdings"""
+    return {column: [] for column in HOLDING_COLUMNS}
+
+
+def _local_name(tag):
+    return tag.rpartition('}')[2] if isinstance(tag, str) else ''
+
+
+def parse_info_table(source, filing_number='', columns=None):
+    """Stream-parse a 13F information table into column buffers
+
+    source is a path or binary file object. Each infoTable entry is read
+    once in document order and cleared as soon as it has been consumed, so
+    memory stays flat regardless of filing size. Rows are appended to
+    columns (created if not given), which is returned along with the
+    number of rows parsed.
+    """
+    if columns is None:
+        columns = empty_columns()
+
+    row = {}
+    in_entry = False
+    count = 0
+    root = None
+
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        name = _local_name(elem.tag)
+        if event == 'start':
+            if root is None:
+                root = elem
+            elif name == 'infoTable':
+                in_entry = True
+                row = {}
+            continue
+
+        if not in_entry:
+            continue
+
+        if name != 'infoTable':
+            if name in FIELDS:
+                row[name] = (elem.text or '').strip()
+            continue
+
+        # Convert the whole entry before appending so a bad value never leaves ragged columns
+        values = []
+        for field, (column, convert) in FIELDS.items():
+            text = row.get(field)
+            if text is None:
+                if field not in OPTIONAL_FIELDS:
+                    raise ValueError(f"infoTable entry {count + 1} is missing {field}")
+                text = ''
+            values.append((column, text if convert is str else convert(text)))
+        for column, value in values:
+            columns[column].append(value)
+        columns['Filing Number'].append(filing_number)
+        count += 1
+
+        # Drop the finished entry and its already-processed siblings
+        in_entry = False
+        elem.clear()
+        root.clear()
+
+    return columns, count
+
+
+def parse_file(file_path):
+    """Parse one downloaded filing, returning (file_path, columns, row_count, error, seconds)
+
+    Used as a process-pool task, so failures are returned rather than raised.
+    The filing number is taken from the filing's directory name.
+    """
+    filing_number = os.path.basename(os.path.dirname(file_path))
+    start = time.perf_counter()
+    try:
+        columns, count = parse_info_table(file_path, filing_number)
+        return file_path, columns, count, None, time.perf_counter() - start
+    except Exception as e:
+        return file_path, None, 0, str(e), time.perf_counter() - start
+
+
+# One read connection per archive in each worker process
+_archives = {}
+
+
+def parse_archived(archive_path, task):
+    """Parse one filing from a FilingArchive, streaming it out of its compressed blob
+
+    task is (cik, member path); otherwise the same contract as parse_file.
+    """
+    cik, member = task
+    filing_number = os.path.basename(os.path.dirname(member))
+    start = time.perf_counter()
+    try:
+        if archive_path not in _archives:
+            _archives[archive_path] = FilingArchive(archive_path)
+        with _archives[archive_path].open(cik, *split_member_path(member)) as stream:
+            columns, count = parse_info_table(stream, filing_number)
+        return member, columns, count, None, time.perf_counter() - start
+    except Exception as e:
+        return member, None, 0, str(e), time.perf_counter() - start
+
+
+def parse_files(file_paths, workers=1, chunksize=PARSE_CHUNKSIZE, archive_path=None):
+    """Parse filings in input order, across a process pool when workers > 1
+
+    With archive_path, file_paths are (cik, member path) pairs read from that archive.
+    """
+    parse = functools.partial(parse_archived, archive_path) if archive_path else parse_file
+    if workers is None or workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(parse, file_paths, chunksize=chunksize)
+    else:
+        yield from map(parse, file_paths)
+
+
+def merge_columns(target, columns):
+    """Append one filing's column buffers onto another set of buffers"""
+    for column, values in columns.items():
+        target[column].extend(values)
+    return target
+
+
+def find_info_tables(directory):
+    """Sorted paths of every downloaded information table under directory"""
+    paths = []
+    for dirpath, dirs, files in os.walk(directory):
+        paths.extend(os.path.join(dirpath, file) for file in files if file.endswith('.xml') and file != COVER_PAGE_FILE)
+    return sorted(paths)
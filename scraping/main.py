@@ -1,14 +1,24 @@
 import pandas as pd
 import time
 import os
-from tqdm import tqdm
-from form13f_scraper import download_form13f_files, scrape_form13f_tables, get_fund_relationships
-import shutil  # For deleting directories
+import argparse
+from form13f_scraper import parse_filing_tree, build_relationship_graph
+from pipeline import FilingPipeline
+from sec_client import SecClient
+from manifest import FilingManifest
+from http_cache import HttpCache
+from holdings_store import DEFAULT_STORE_DIR, write_holdings
+from security_master import SecurityMaster
+from bulk_ingest import load_13f_datasets, read_full_index
+from fund_relationships import save_relationships
+from filing_archive import FilingArchive
+from run_report import DEFAULT_REPORT_PATH, RunProfiler, default_metrics
+from holdings_db import HoldingsLoader
 
 def get_hedge_funds_data():
     """Read hedge funds and their CIKs from hedge_funds_with_ciks.csv"""
     try:
-        df = pd.read_csv('scraping/hedge_funds_with_ciks.csv')
+        df = pd.read_csv('scraping/hedge_funds_with_ciks.csv', dtype={'CIK': str})
         # Filter out NOT_FOUND CIKs and create dictionary
         valid_funds = df[df['CIK'] != 'NOT_FOUND']
         return dict(zip(valid_funds['Hedge Fund Name'], valid_funds['CIK']))
@@ -16,7 +26,104 @@ def get_hedge_funds_data():
         print("hedge_funds_with_ciks.csv not found")
         return {}
 
+def save_fund_holdings(holdings_df, fund_dir, fund_name, cik, security_master, store_dir=DEFAULT_STORE_DIR, loader=None):
+    """Tag a fund's holdings with its name, CIK and security IDs and save them to CSV and the Parquet store
+    
+    With a HoldingsLoader, they are also loaded into the backend's database tables.
+    """
+    if holdings_df.empty:
+        print(f"No holdings found for {fund_name}")
+        return
+    
+    print(f"Found {len(holdings_df)} holdings")
+    holdings_df['Fund Name'] = fund_name
+    holdings_df['CIK'] = cik
+    holdings_df['Security ID'] = security_master.assign(holdings_df)
+    
+    # Save to CSV
+    output_path = os.path.join(fund_dir, 'form13f_holdings.csv')
+    holdings_df.to_csv(output_path, index=False)
+    write_holdings(holdings_df, cik, store_dir)
+    print(f"Saved holdings to {output_path} and {store_dir}")
+    if loader is not None:
+        loader.load(holdings_df, cik)
+
+def parse_only(funds_data, base_output_dir, manifest, security_master, workers, archive, loader=None):
+    """Re-parse every downloaded filing without touching the network"""
+    names_by_cik = {cik: name for name, cik in funds_data.items()}
+    start = time.perf_counter()
+    holdings = parse_filing_tree(base_output_dir, workers=workers, manifest=manifest, archive=archive)
+    
+    for cik, holdings_df in holdings.items():
+        fund_name = names_by_cik.get(cik, cik)
+        print(f"\n{fund_name} (CIK: {cik})")
+        save_fund_holdings(holdings_df, os.path.join(base_output_dir, f"fund_{cik}"), fund_name, cik, security_master,
+                           loader=loader)
+    
+    print(f"\nParsed {len(holdings)} funds in {time.perf_counter() - start:.1f}s")
+
+def ingest_datasets(funds_data, bulk_dir, base_output_dir, security_master, loader=None):
+    """Load holdings for every tracked fund from local Form 13F data set ZIPs, offline"""
+    names_by_cik = {str(cik).zfill(10): name for name, cik in funds_data.items()}
+    start = time.perf_counter()
+    holdings = load_13f_datasets(bulk_dir, names_by_cik)
+    if holdings.empty:
+        print(f"No holdings for the tracked funds in {bulk_dir}")
+        return
+    
+    for cik, holdings_df in holdings.groupby('CIK', sort=True):
+        fund_name = names_by_cik[cik]
+        print(f"\n{fund_name} (CIK: {cik})")
+        fund_dir = os.path.join(base_output_dir, f"fund_{cik}")
+        os.makedirs(fund_dir, exist_ok=True)
+        holdings_df = holdings_df.drop(columns=['CIK']).reset_index(drop=True)
+        save_fund_holdings(holdings_df, fund_dir, fund_name, cik, security_master, loader=loader)
+    
+    print(f"\nLoaded {holdings['CIK'].nunique()} funds from data sets in {time.perf_counter() - start:.1f}s")
+
+def index_filings(funds_data, bulk_dir):
+    """13F-HR filings per tracked CIK from local quarterly form.idx/master.idx files"""
+    filings = read_full_index(bulk_dir, funds_data.values())
+    print(f"Found {len(filings)} 13F filings for the tracked funds in the full index")
+    return {cik: group for cik, group in filings.groupby('cik')}
+
+def finish_run(metrics, profiler, report_path, **summaries):
+    """Stop the profiling hooks and write the JSON run report, with other components' summaries attached"""
+    profiler.stop(metrics)
+    for key, value in summaries.items():
+        metrics.set(key, value)
+    metrics.write_report(report_path)
+    print(f"Run report: {metrics.summary()}; saved to {report_path}")
+    metrics.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Download and parse 13F holdings for the tracked hedge funds")
+    parser.add_argument('--parse-only', action='store_true',
+                        help="Re-parse all downloaded filings under filling/ without downloading")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Number of parser processes (default: CPU count)")
+    parser.add_argument('--bulk-dir',
+                        help="Directory of EDGAR quarterly form.idx/master.idx files or Form 13F data set ZIPs "
+                             "to use instead of the per-CIK submissions API")
+    parser.add_argument('--report', default=DEFAULT_REPORT_PATH,
+                        help="JSON run report path; failures and per-fund events go to the same name with .ndjson")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Profile every thread of the run with cProfile and save the merged stats to PATH "
+                             "(parser processes are not included)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Trace allocations with tracemalloc and report the peak and top allocation sites")
+    parser.add_argument('--db', metavar='PATH',
+                        help="Also bulk-load parsed holdings into the backend schema in this SQLite database")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    
+    # Counters shared by the HTTP client, parsers, pipeline and analyzer for the run report
+    metrics = default_metrics()
+    metrics.start_event_log(os.path.splitext(args.report)[0] + '.ndjson')
+    profiler = RunProfiler(args.profile, args.trace_memory).start()
+    
     print("Starting 13F Holdings Scraper")
     funds_data = get_hedge_funds_data()
     
@@ -27,40 +134,92 @@ if __name__ == "__main__":
     print(f"Found {len(funds_data)} hedge funds to process")
     base_output_dir = "filling"
     
-    # Process each fund directly
-    for fund_name, cik in funds_data.items():
-        print(f"\nProcessing {fund_name} (CIK: {cik})")
-        
-        # Create directory for this fund
-        fund_dir = os.path.join(base_output_dir, f"fund_{cik}")
-        os.makedirs(fund_dir, exist_ok=True)
-        
-        try:
-            # Download 13F files
-            print(f"Downloading 13F filings...")
-            download_form13f_files(cik, fund_dir)
-            
-            # Scrape tables from downloaded files
-            print(f"Processing downloaded filings...")
-            holdings_df = scrape_form13f_tables(fund_dir)
-            
-            if not holdings_df.empty:
-                print(f"Found {len(holdings_df)} holdings")
-                holdings_df['Fund Name'] = fund_name
-                holdings_df['CIK'] = cik
-                
-                # Save to CSV
-                output_path = os.path.join(fund_dir, 'form13f_holdings.csv')
-                holdings_df.to_csv(output_path, index=False)
-                print(f"Saved holdings to {output_path}")
-            else:
-                print(f"No holdings found for {fund_name}")
-                
-        except Exception as e:
-            print(f"Error processing {fund_name}: {str(e)}")
-            continue
+    # Tracks fetched accessions so reruns only download new or failed filings
+    manifest = FilingManifest(os.path.join(base_output_dir, 'manifest.sqlite'))
+    
+    # Integer IDs per (CUSIP, put/call), stable across runs
+    security_master = SecurityMaster(os.path.join(base_output_dir, 'security_master.csv'))
+    
+    # Raw filings are stored compressed in one SQLite file; older runs' filing
+    # directories are imported the first time
+    archive = FilingArchive(os.path.join(base_output_dir, 'archive.sqlite'))
+    if not archive.ciks() and os.path.isdir(base_output_dir):
+        imported = archive.import_tree(base_output_dir, manifest=manifest)
+        if imported:
+            print(f"Imported {imported} downloaded documents into the archive ({archive.summary()})")
+    
+    # Holdings go straight from the parser into the database in batched transactions
+    loader = None
+    if args.db:
+        loader = HoldingsLoader(args.db)
+        loader.begin_bulk()
+    
+    if args.parse_only:
+        with metrics.timed('parse only'):
+            parse_only(funds_data, base_output_dir, manifest, security_master, args.workers, archive, loader)
+        security_master.save()
+        if loader is not None:
+            print(f"Database: {loader.summary()}")
+            loader.close()
+        finish_run(metrics, profiler, args.report, manifest=manifest.summary())
+        manifest.close()
+        archive.close()
+        exit(0)
+    
+    bulk_filings = None
+    if args.bulk_dir:
+        if any(name.lower().endswith('.zip') for name in os.listdir(args.bulk_dir)):
+            with metrics.timed('bulk ingest'):
+                ingest_datasets(funds_data, args.bulk_dir, base_output_dir, security_master, loader)
+            security_master.save()
+            if loader is not None:
+                print(f"Database: {loader.summary()}")
+                loader.close()
+            finish_run(metrics, profiler, args.report)
+            manifest.close()
+            archive.close()
+            exit(0)
+        # Index files only list filings, so the information tables are still downloaded
+        bulk_filings = index_filings(funds_data, args.bulk_dir)
+    
+    # One pooled client for the whole run so concurrent downloads across funds share
+    # EDGAR's rate limit, connections and backoff
+    client = SecClient()
+    http_cache = HttpCache(os.path.join(base_output_dir, 'http_cache'))
+    
+    # Filings flow from download to parse to save one at a time, so the network and the
+    # parser processes stay busy together instead of taking turns fund by fund
+    pipeline = FilingPipeline(
+        base_output_dir, client=client, cache=http_cache, manifest=manifest, archive=archive, parse_workers=args.workers,
+        on_fund=lambda holdings_df, fund_dir, fund_name, cik: save_fund_holdings(holdings_df, fund_dir, fund_name, cik,
+                                                                                 security_master, loader=loader)
+    )
+    pipeline.run(funds_data, bulk_filings)
+    
+    # Parent groups from the submissions and cover pages fetched above, without new requests
+    with metrics.timed('relationships'):
+        graph = build_relationship_graph(funds_data.values(), client, http_cache, base_output_dir, archive)
+    save_relationships(graph, os.path.join(base_output_dir, 'fund_relationships.csv'))
     
     print("\nProcessing complete!")
     print(f"Total hedge funds processed: {len(funds_data)}")
+    print(pipeline.summary())
+    print(f"EDGAR requests: {client.summary()}")
+    print(f"Manifest: {manifest.summary()}")
+    print(f"Submissions cache: {http_cache.summary()}")
+    security_master.save()
+    print(f"Security master: {len(security_master)} securities")
+    failures = manifest.failures()
+    if failures:
+        print(f"{len(failures)} filings failed to download or parse; failed downloads are retried on the next run")
+    print(f"Archive: {archive.summary()}")
+    if loader is not None:
+        print(f"Database: {loader.summary()}")
+        loader.close()
+    finish_run(metrics, profiler, args.report, pipeline=pipeline.report(), edgar=client.summary(),
+               manifest=manifest.summary(), submissions_cache=http_cache.summary(), archive=archive.stats())
+    manifest.close()
+    archive.close()
+    client.close()
     print(f"\nResults saved to:")
-    print(f"Directory: {base_output_dir}") 
\ No newline at end of file
+    print(f"Directory: {base_output_dir}")
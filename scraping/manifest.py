@@ -0,0 +1,116 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DEFAULT_MANIFEST_PATH = os.path.join('filling', 'manifest.sqlite')
+
+
+class FilingManifest:
+    """SQLite record of the filings already downloaded and parsed, keyed by (CIK, accession)"""
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS filings (
+                cik TEXT NOT NULL,
+                accession_number TEXT NOT NULL,
+                download_status TEXT,
+                file_path TEXT,
+                size INTEGER,
+                sha256 TEXT,
+                parse_status TEXT,
+                row_count INTEGER,
+                error TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (cik, accession_number)
+            )
+        """)
+        self._conn.commit()
+
+    def _upsert(self, cik, accession, **fields):
+        fields['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        columns = ', '.join(fields)
+        placeholders = ', '.join('?' for _ in fields)
+        updates = ', '.join(f"{column} = excluded.{column}" for column in fields)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO filings (cik, accession_number, {columns}) VALUES (?, ?, {placeholders}) "
+                f"ON CONFLICT (cik, accession_number) DO UPDATE SET {updates}",
+                (normalize_cik(cik), accession, *fields.values())
+            )
+            self._conn.commit()
+
+    def record_download(self, cik, accession, file_path, content):
+        """Mark a filing as downloaded along with its size and checksum"""
+        self._upsert(
+            cik, accession,
+            download_status='downloaded',
+            file_path=file_path,
+            size=len(content),
+            sha256=hashlib.sha256(content).hexdigest(),
+            error=None
+        )
+
+    def record_failure(self, cik, accession, error):
+        """Mark a filing as failed so the next run retries it"""
+        self._upsert(cik, accession, download_status='failed', error=str(error))
+
+    def record_parse(self, cik, accession, row_count=None, error=None):
+        """Record the outcome of parsing a downloaded filing"""
+        self._upsert(
+            cik, accession,
+            parse_status='failed' if error else 'parsed',
+            row_count=row_count,
+            error=str(error) if error else None
+        )
+
+    def downloaded(self, cik, exists=os.path.exists):
+        """Accession numbers of a fund that were downloaded successfully
+
+        exists checks that a recorded file_path is still present.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT accession_number, file_path FROM filings WHERE cik = ? AND download_status = 'downloaded'",
+                (normalize_cik(cik),)
+            ).fetchall()
+        # A filing only counts as done if its file is still stored
+        return {accession for accession, file_path in rows if file_path and exists(file_path)}
+
+    def pending(self, cik, accessions, exists=os.path.exists):
+        """Subset of accessions that are new or previously failed"""
+        done = self.downloaded(cik, exists)
+        return [accession for accession in accessions if accession not in done]
+
+    def failures(self, cik=None):
+        """List (cik, accession, error) for failed downloads or parses"""
+        query = "SELECT cik, accession_number, error FROM filings WHERE (download_status = 'failed' OR parse_status = 'failed')"
+        params = ()
+        if cik is not None:
+            query += " AND cik = ?"
+            params = (normalize_cik(cik),)
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def summary(self):
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT COALESCE(download_status, 'unknown'), COUNT(*) FROM filings GROUP BY 1"
+            ).fetchall())
+        return ', '.join(f"{status}: {count}" for status, count in sorted(counts.items())) or 'empty'
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def normalize_cik(cik):
+    """Zero-pad a CIK to the 10 digits used by EDGAR"""
+    return str(cik).zfill(10)
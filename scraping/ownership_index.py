@@ -0,0 +1,195 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from holdings_store import DEFAULT_STORE_DIR, parse_dates, read_holdings
+
+DEFAULT_INDEX_PATH = os.path.join('filling', 'ownership_index.parquet')
+
+
+class OwnershipIndex:
+    """Inverted index from CUSIP to (fund, quarter, shares, value) across all funds
+
+    Positions are aggregated per (CUSIP, fund, quarter) and kept as flat
+    arrays sorted by CUSIP, then quarter, then fund, so every lookup is a
+    binary search over the CUSIP column followed by a contiguous slice.
+    Only direct holdings are indexed: put and call rows report the
+    underlying's notional amount, so they are left out rather than added to
+    share counts, and a fund holding only options is not a holder.
+    """
+
+    def __init__(self, cusips, funds, quarters, shares, values, fund_names):
+        self.cusips = cusips
+        self.funds = funds            # integer codes into fund_names
+        self.quarters = quarters      # datetime64[D] report dates
+        self.shares = shares
+        self.values = values
+        self.fund_names = np.asarray(fund_names, dtype=object)
+        self._active_by_quarter = None
+
+    @classmethod
+    def build(cls, df):
+        """Build the index from a holdings frame with CUSIP, Fund Name and Report Date
+
+        Rows with a PUT/CALL value are dropped before aggregating.
+        """
+        if 'PUT/CALL' in df.columns:
+            df = df[df['PUT/CALL'].fillna('').astype(str).str.strip() == '']
+        positions = pd.DataFrame({
+            'CUSIP': df['CUSIP'].astype(str).str.strip().str.upper(),
+            'Fund Name': df['Fund Name'].astype('category'),
+            'Report Date': parse_dates(df['Report Date']),
+            'shares': pd.to_numeric(df['SHRS OR PRN AMT'], errors='coerce').fillna(0),
+            'value': pd.to_numeric(df['VALUE (x$1000)'], errors='coerce').fillna(0),
+        }).dropna(subset=['Report Date'])
+        positions = (
+            positions.groupby(['CUSIP', 'Report Date', 'Fund Name'], observed=True, sort=True)[['shares', 'value']]
+            .sum()
+            .reset_index()
+        )
+        fund_names = positions['Fund Name'].cat.categories
+        return cls(
+            positions['CUSIP'].to_numpy(dtype='U9'),
+            positions['Fund Name'].cat.codes.to_numpy(dtype=np.int32),
+            positions['Report Date'].to_numpy(dtype='datetime64[D]'),
+            positions['shares'].to_numpy(dtype=np.int64),
+            positions['value'].to_numpy(dtype=np.float64),
+            list(fund_names)
+        )
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        """Persist the sorted arrays as a single Parquet file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        table = pa.table({
+            'cusip': pa.array(self.cusips.astype(str)),
+            'fund': pa.DictionaryArray.from_arrays(pa.array(self.funds), pa.array(self.fund_names.astype(str))),
+            'quarter': pa.array(self.quarters),
+            'shares': pa.array(self.shares),
+            'value': pa.array(self.values),
+        })
+        pq.write_table(table, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        table = pq.read_table(path)
+        fund = table.column('fund').combine_chunks()
+        return cls(
+            table.column('cusip').to_numpy(zero_copy_only=False).astype('U9'),
+            fund.indices.to_numpy(zero_copy_only=False).astype(np.int32),
+            table.column('quarter').to_numpy().astype('datetime64[D]'),
+            table.column('shares').to_numpy(),
+            table.column('value').to_numpy(),
+            fund.dictionary.to_pylist()
+        )
+
+    def __len__(self):
+        return len(self.cusips)
+
+    def _range(self, cusip):
+        cusip = str(cusip).strip().upper()
+        return (
+            np.searchsorted(self.cusips, cusip, side='left'),
+            np.searchsorted(self.cusips, cusip, side='right')
+        )
+
+    def _latest_quarter(self, start, stop):
+        return self.quarters[stop - 1] if stop > start else None
+
+    def holders(self, cusip, quarter=None):
+        """Every fund position in a CUSIP, optionally for one quarter"""
+        start, stop = self._range(cusip)
+        quarters = self.quarters[start:stop]
+        if quarter is not None:
+            # Rows of one CUSIP are sorted by quarter, so a second search narrows the slice
+            quarter = np.datetime64(pd.Timestamp(quarter).date(), 'D')
+            lo, hi = np.searchsorted(quarters, quarter, 'left'), np.searchsorted(quarters, quarter, 'right')
+            start, stop = start + lo, start + hi
+            quarters = self.quarters[start:stop]
+        return pd.DataFrame({
+            'Fund Name': self.fund_names[self.funds[start:stop]],
+            'Report Date': quarters,
+            'shares': self.shares[start:stop],
+            'value': self.values[start:stop],
+        })
+
+    def top_holders(self, cusip, quarter=None, n=10):
+        """Largest holders by value in a quarter (default: the latest one with holders)"""
+        if quarter is None:
+            quarter = self._latest_quarter(*self._range(cusip))
+            if quarter is None:
+                return self.holders(cusip)
+        holders = self.holders(cusip, quarter)
+        total = holders['value'].sum()
+        holders['share_of_reported_value'] = holders['value'] / total * 100 if total else 0.0
+        return holders.nlargest(n, 'value').reset_index(drop=True)
+
+    def ownership_deltas(self, cusip):
+        """Aggregate ownership of a CUSIP per quarter and its quarter-over-quarter change"""
+        holders = self.holders(cusip)
+        by_quarter = holders.groupby('Report Date').agg(
+            holders=('Fund Name', 'size'), shares=('shares', 'sum'), value=('value', 'sum')
+        )
+        funds_by_quarter = holders.groupby('Report Date')['Fund Name'].agg(frozenset)
+        previous = funds_by_quarter.shift(1)
+        by_quarter['new_holders'] = [
+            len(funds - prev) if isinstance(prev, frozenset) else len(funds)
+            for funds, prev in zip(funds_by_quarter, previous)
+        ]
+        by_quarter['exited_holders'] = [
+            len(prev - funds) if isinstance(prev, frozenset) else 0
+            for funds, prev in zip(funds_by_quarter, previous)
+        ]
+        by_quarter['shares_change'] = by_quarter['shares'].diff()
+        by_quarter['value_change'] = by_quarter['value'].diff()
+        return by_quarter.reset_index()
+
+    def _active_funds(self, quarter):
+        """Number of funds with any position in a quarter, counted once for all quarters"""
+        if self._active_by_quarter is None:
+            pairs = pd.DataFrame({'quarter': self.quarters, 'fund': self.funds}).drop_duplicates()
+            self._active_by_quarter = pairs['quarter'].value_counts().to_dict()
+        return self._active_by_quarter.get(pd.Timestamp(quarter), 0)
+
+    def crowding_score(self, cusip, quarter=None):
+        """Share of funds filing in the quarter that hold the CUSIP (0-1)"""
+        start, stop = self._range(cusip)
+        if quarter is None:
+            quarter = self._latest_quarter(start, stop)
+            if quarter is None:
+                return 0.0
+        quarter = np.datetime64(pd.Timestamp(quarter).date(), 'D')
+        holders = len(np.unique(self.funds[start:stop][self.quarters[start:stop] == quarter]))
+        active = self._active_funds(quarter)
+        return holders / active if active else 0.0
+
+    def most_crowded(self, quarter, n=20):
+        """CUSIPs held by the most funds in a quarter, with their crowding scores"""
+        quarter = np.datetime64(pd.Timestamp(quarter).date(), 'D')
+        mask = self.quarters == quarter
+        cusips, holders = np.unique(self.cusips[mask], return_counts=True)
+        active = self._active_funds(quarter)
+        order = np.argsort(-holders, kind='stable')[:n]
+        return pd.DataFrame({
+            'CUSIP': cusips[order],
+            'holders': holders[order],
+            'crowding_score': holders[order] / active if active else 0.0,
+        })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the cross-fund CUSIP ownership index from the holdings store")
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR)
+    parser.add_argument('--output', default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args()
+
+    holdings = read_holdings(args.store, columns=['CUSIP', 'Fund Name', 'Report Date', 'PUT/CALL', 'SHRS OR PRN AMT',
+                                                  'VALUE (x$1000)'])
+    index = OwnershipIndex.build(holdings)
+    index.save(args.output)
+    print(f"Indexed {len(index)} positions across {len(index.fund_names)} funds into {args.output}")
@@ -0,0 +1,296 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from filing_archive import member_path, split_member_path
+from form13f_scraper import (DOWNLOAD_WORKERS, collect_parsed, default_sec_client, download_filing, holdings_frame,
+                             list_form13f_filings, load_url_cache, pending_filings, save_url_cache)
+from info_table_parser import find_info_tables, parse_archived, parse_file
+from run_report import default_metrics
+
+# Downloaded filings waiting for a parser; fetchers block once it is full
+PARSE_QUEUE_SIZE = 32
+# Filings submitted to or parsed by the pool but not yet taken by the writer, per parser process
+PARSES_IN_FLIGHT = 2
+
+
+def _parse(archive_path, task):
+    return parse_archived(archive_path, task) if archive_path else parse_file(task)
+
+
+class StageStats:
+    """Items, busy time and time spent blocked on a full downstream stage, for one stage"""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, busy=0.0, blocked=0.0, items=1):
+        with self._lock:
+            self.items += items
+            self.busy += busy
+            self.blocked += blocked
+
+    def utilization(self, elapsed):
+        return self.busy / (elapsed * self.workers) if elapsed else 0.0
+
+    def summary(self, elapsed):
+        return (f"{self.name:<6} {self.items:>6} items  busy {self.busy:8.1f}s  "
+                f"{self.utilization(elapsed):4.0%} of {self.workers:>2} workers  blocked {self.blocked:6.1f}s")
+
+
+class FilingPipeline:
+    """Fetch, parse and write every fund's filings as one staged pipeline
+
+    A lister walks the funds, a thread pool downloads each filing, a
+    process pool parses each filing as soon as its bytes are stored and a
+    single writer thread saves a fund's holdings once its last filing is
+    parsed. Bounded queues between the stages apply backpressure, so at
+    most a few dozen filings are held in memory however far the network
+    runs ahead of the parsers, and downloading and parsing overlap instead
+    of alternating fund by fund.
+    """
+
+    def __init__(self, base_dir, client=None, cache=None, manifest=None, archive=None,
+                 fetch_workers=DOWNLOAD_WORKERS, parse_workers=None, queue_size=PARSE_QUEUE_SIZE, on_fund=None):
+        self.base_dir = base_dir
+        self.client = client or default_sec_client()
+        self.cache = cache
+        self.manifest = manifest
+        self.archive = archive
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers or os.cpu_count()
+        self.queue_size = queue_size
+        # Called from the writer thread as on_fund(holdings_df, fund_dir, fund_name, cik)
+        self.on_fund = on_fund
+
+        self.stages = {
+            'list': StageStats('list', 1),
+            'fetch': StageStats('fetch', fetch_workers),
+            'parse': StageStats('parse', self.parse_workers),
+            'write': StageStats('write', 1),
+        }
+        self.elapsed = 0.0
+        self.funds_written = 0
+        self._parse_pool = None
+
+    def _fund_tasks(self, cik, fund_dir, filings):
+        """(parse tasks of filings already stored, filings still to download)"""
+        to_fetch = pending_filings(cik, filings, self.manifest, self.archive) if self.manifest is not None else filings
+        fetching = {filing['accessionNumber'] for filing in to_fetch}
+        if self.archive is not None:
+            stored = [(cik, path) for path in self.archive.paths(fund_dir, cik)]
+            stored = [task for task in stored if split_member_path(task[1])[0] not in fetching]
+        else:
+            stored = [path for path in find_info_tables(fund_dir) if split_member_path(path)[0] not in fetching]
+        return stored, to_fetch
+
+    def _parse_task(self, fund_dir, cik, accession):
+        path = member_path(fund_dir, accession)
+        return (cik, path) if self.archive is not None else path
+
+    def _fetch(self, fund, filing, url_cache, parse_queue, write_queue, fetch_slots):
+        """Download one filing and hand it to the parsers, waiting while their queue is full"""
+        fund_dir, _, cik = fund
+        try:
+            start = time.perf_counter()
+            try:
+                ok = download_filing(cik, filing, fund_dir, self.client, url_cache, self.manifest, self.archive)
+            except Exception as e:
+                print(f"Error downloading filing {filing['accessionNumber']}: {e}")
+                default_metrics().record_failure('download', filing['accessionNumber'], e)
+                ok = False
+            fetched = time.perf_counter()
+
+            if ok:
+                parse_queue.put((fund, self._parse_task(fund_dir, cik, filing['accessionNumber'])))
+            else:
+                write_queue.put(('skipped', fund, None))
+            self.stages['fetch'].add(fetched - start, time.perf_counter() - fetched)
+        finally:
+            fetch_slots.release()
+
+    def _submit(self, archive_path, task):
+        """Submit one parse, replacing the pool once if a dead worker process broke it"""
+        try:
+            return self._parse_pool.submit(_parse, archive_path, task)
+        except BrokenProcessPool as e:
+            print(f"Parser pool broke ({e}); starting a new one")
+            default_metrics().record_failure('parse pool', task, e)
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+            return self._parse_pool.submit(_parse, archive_path, task)
+
+    def _dispatch(self, parse_queue, write_queue, parse_slots):
+        """Submit queued filings to the parser pool, at most parse_slots at a time
+
+        A filing that cannot be submitted is passed to the writer as a failed
+        parse, so it is recorded in the manifest and the queue keeps draining.
+        """
+        archive_path = self.archive.path if self.archive is not None else None
+
+        def parsed(future, fund):
+            try:
+                write_queue.put(('parsed', fund, future.result()))
+            except Exception as e:
+                # The pool itself failed, e.g. a worker process was killed
+                write_queue.put(('parsed', fund, (future.path, None, 0, str(e), 0.0)))
+
+        while True:
+            item = parse_queue.get()
+            if item is None:
+                return
+            fund, task = item
+            path = task[1] if isinstance(task, tuple) else task
+            start = time.perf_counter()
+            parse_slots.acquire()
+            self.stages['parse'].add(blocked=time.perf_counter() - start, items=0)
+            try:
+                future = self._submit(archive_path, task)
+            except Exception as e:
+                write_queue.put(('parsed', fund, (path, None, 0, str(e), 0.0)))
+                continue
+            future.path = path
+            future.add_done_callback(lambda future, fund=fund: parsed(future, fund))
+
+    def _write(self, write_queue, parse_slots):
+        """Collect each fund's parsed filings and save its holdings once all of them are in"""
+        funds = {}
+        while True:
+            message = write_queue.get()
+            if message is None:
+                break
+            kind, fund, payload = message
+            start = time.perf_counter()
+            if kind == 'fund':
+                expected, url_cache = payload
+                funds[fund] = {'expected': expected, 'url_cache': url_cache, 'results': [], 'done': 0}
+            elif kind == 'parsed':
+                funds[fund]['results'].append(payload)
+                funds[fund]['done'] += 1
+                self.stages['parse'].add(payload[4])
+                parse_slots.release()
+            else:
+                funds[fund]['done'] += 1
+
+            state = funds[fund]
+            if state['done'] == state['expected']:
+                del funds[fund]
+                self._save_fund(fund, state)
+                self.stages['write'].add(time.perf_counter() - start)
+            else:
+                self.stages['write'].add(time.perf_counter() - start, items=0)
+
+    def _save_fund(self, fund, state):
+        fund_dir, fund_name, cik = fund
+        try:
+            if state['url_cache'] is not None:
+                save_url_cache(fund_dir, state['url_cache'])
+            # Parsed in arrival order, merged in path order like scrape_form13f_tables
+            results = sorted(state['results'], key=lambda result: result[0])
+            holdings_df = holdings_frame(collect_parsed(results, self.manifest, cik), fund_dir, self.archive, cik)
+            print(f"\n{fund_name} (CIK: {cik}): {len(state['results'])} filings parsed")
+            default_metrics().event('fund', cik=cik, name=fund_name, filings=len(results), holdings=len(holdings_df))
+            if self.on_fund is not None:
+                self.on_fund(holdings_df, fund_dir, fund_name, cik)
+            self.funds_written += 1
+        except Exception as e:
+            print(f"Error saving holdings of {fund_name}: {e}")
+            default_metrics().record_failure('write', cik, e)
+
+    def run(self, funds, filings_by_cik=None):
+        """Download, parse and save every fund in {fund name: CIK}
+
+        filings_by_cik, e.g. from the quarterly full index, replaces the
+        submissions API lookup; funds missing from it are skipped.
+        """
+        start = time.perf_counter()
+        parse_queue = queue.Queue(maxsize=self.queue_size)
+        # Unbounded, but never holds more than parse_slots results plus one message per fund and failed fetch
+        write_queue = queue.Queue()
+        fetch_slots = threading.BoundedSemaphore(self.fetch_workers * 2)
+        parse_slots = threading.BoundedSemaphore(self.parse_workers * PARSES_IN_FLIGHT)
+
+        fetch_pool = ThreadPoolExecutor(max_workers=self.fetch_workers)
+        self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        dispatcher = threading.Thread(target=self._dispatch, args=(parse_queue, write_queue, parse_slots),
+                                      name='pipeline-dispatch', daemon=True)
+        writer = threading.Thread(target=self._write, args=(write_queue, parse_slots), name='pipeline-write', daemon=True)
+        dispatcher.start()
+        writer.start()
+
+        try:
+            for fund_name, cik in funds.items():
+                cik = str(cik).zfill(10)
+                fund_dir = os.path.join(self.base_dir, f"fund_{cik}")
+                os.makedirs(fund_dir, exist_ok=True)
+                fund = (fund_dir, fund_name, cik)
+
+                listed = time.perf_counter()
+                try:
+                    fund_filings = None
+                    if filings_by_cik is not None:
+                        fund_filings = filings_by_cik.get(cik)
+                        if fund_filings is None:
+                            print(f"No 13F filings in the full index for {fund_name} (CIK: {cik})")
+                            continue
+                    filings = list_form13f_filings(cik, fund_dir, self.client, self.cache, fund_filings)
+                    stored, to_fetch = self._fund_tasks(cik, fund_dir, filings)
+                except Exception as e:
+                    print(f"Error listing filings of {fund_name}: {e}")
+                    default_metrics().record_failure('list', cik, e)
+                    continue
+
+                url_cache = load_url_cache(fund_dir) if to_fetch else None
+                write_queue.put(('fund', fund, (len(stored) + len(to_fetch), url_cache)))
+                print(f"Queued {fund_name} (CIK: {cik}): {len(to_fetch)} filings to download, {len(stored)} already stored")
+
+                blocked = 0.0
+                for task in stored:
+                    waited = time.perf_counter()
+                    parse_queue.put((fund, task))
+                    blocked += time.perf_counter() - waited
+                for filing in to_fetch:
+                    waited = time.perf_counter()
+                    fetch_slots.acquire()
+                    blocked += time.perf_counter() - waited
+                    fetch_pool.submit(self._fetch, fund, filing, url_cache, parse_queue, write_queue, fetch_slots)
+                self.stages['list'].add(time.perf_counter() - listed - blocked, blocked)
+        finally:
+            # Drain each stage in order: every fetch has queued its filing before the
+            # dispatcher stops, and every parse has reached the writer before it stops
+            fetch_pool.shutdown(wait=True)
+            parse_queue.put(None)
+            dispatcher.join()
+            self._parse_pool.shutdown(wait=True)
+            write_queue.put(None)
+            writer.join()
+            self.elapsed = time.perf_counter() - start
+        return self.funds_written
+
+    def report(self):
+        """Per-stage numbers for the run report"""
+        return {
+            'elapsed_seconds': round(self.elapsed, 3),
+            'funds': self.funds_written,
+            'stages': {name: {'items': stage.items, 'workers': stage.workers, 'busy_seconds': round(stage.busy, 3),
+                              'blocked_seconds': round(stage.blocked, 3),
+                              'utilization': round(stage.utilization(self.elapsed), 3)}
+                       for name, stage in self.stages.items()},
+        }
+
+    def summary(self):
+        """Per-stage utilization; the most utilized stage is the bottleneck"""
+        lines = [f"Pipeline: {self.funds_written} funds in {self.elapsed:.1f}s"]
+        lines += [f"  {stage.summary(self.elapsed)}" for stage in self.stages.values()]
+        bottleneck = max(self.stages.values(), key=lambda stage: stage.utilization(self.elapsed))
+        serial = sum(stage.busy / stage.workers for stage in self.stages.values())
+        lines.append(f"  bottleneck: {bottleneck.name}; stages back to back would take about {serial:.1f}s")
+        return '\n'.join(lines)
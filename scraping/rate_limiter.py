@@ -0,0 +1,45 @@
+import threading
+import time
+
+# SEC asks automated clients to stay at or below 10 requests per second
+EDGAR_MAX_RPS = 10
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every request sent to EDGAR"""
+
+    def __init__(self, rate=EDGAR_MAX_RPS, burst=1):
+        self.rate = float(rate)
+        # A burst of 1 spaces requests evenly so no one-second window exceeds the rate
+        self.capacity = float(burst)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.started_at = None
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    if self.started_at is None:
+                        self.started_at = now
+                    self.request_count += 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def achieved_rate(self):
+        """Requests per second actually sent since the first acquire"""
+        if self.started_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self.started_at
+        return self.request_count / elapsed if elapsed > 0 else float(self.request_count)
+
+    def summary(self):
+        return f"{self.request_count} requests at {self.achieved_rate():.2f} req/s (limit {self.rate:g} req/s)"
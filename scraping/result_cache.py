@@ -0,0 +1,133 @@
+import functools
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+# Bump when the layout of pickled results changes; older disk entries are then ignored and pruned
+CACHE_FORMAT_VERSION = 1
+# Disk entries unused for this long are deleted by prune()
+DISK_MAX_AGE_DAYS = 30
+
+
+class ResultCache:
+    """LRU cache of analysis results with an optional on-disk tier
+
+    Keys are tuples such as (fund, quarter, analysis, data_version). The
+    in-memory tier holds at most max_entries results; when disk_dir is set,
+    every result is also pickled there so later runs can reuse it as long
+    as the data version in the key is unchanged. Disk entries live in a
+    subdirectory named after CACHE_FORMAT_VERSION and the caller's code
+    version, so bumping either starts a fresh cache. prune() deletes
+    other versions and entries unused for max_age_days. Deleting disk_dir
+    clears the cache.
+    """
+
+    def __init__(self, max_entries=256, disk_dir=None, version=0, max_age_days=DISK_MAX_AGE_DAYS):
+        self.max_entries = max_entries
+        self.root_dir = disk_dir
+        self.disk_dir = os.path.join(disk_dir, f"v{CACHE_FORMAT_VERSION}.{version}") if disk_dir else None
+        self.max_age_days = max_age_days
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.pkl")
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+                # Age is counted from the last use, for prune()
+                os.utime(path)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                pass
+            else:
+                self.disk_hits += 1
+                self._remember(key, value)
+                return value
+
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(f"{path}.part", 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(f"{path}.part", path)
+            except (OSError, pickle.PicklingError, TypeError) as e:
+                print(f"Could not write cached result to disk: {e}")
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def prune(self):
+        """Delete other versions' disk entries and entries unused for max_age_days; returns how many files went"""
+        if not self.disk_dir:
+            return 0
+        removed = 0
+        for entry in os.scandir(self.root_dir):
+            if entry.is_dir() and entry.path != self.disk_dir and entry.name.startswith('v'):
+                removed += sum(len(files) for _, _, files in os.walk(entry.path))
+                shutil.rmtree(entry.path, ignore_errors=True)
+        cutoff = time.time() - self.max_age_days * 86400
+        for entry in os.scandir(self.disk_dir):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def summary(self):
+        return f"{self.hits} memory hits, {self.disk_hits} disk hits, {self.misses} misses"
+
+
+def memoized(analysis):
+    """Cache a per-fund HedgeFundAnalyzer method in the analyzer's ResultCache
+
+    The key is (fund, remaining arguments, analysis, fund data version), so
+    a result is reused until that fund's holdings change. Cached results are
+    shared between callers and must not be mutated.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, fund_name, *args, **kwargs):
+            quarter = tuple(str(arg) for arg in args) + tuple(f"{k}={v}" for k, v in sorted(kwargs.items()))
+            key = (fund_name, quarter, analysis, self.data_version(fund_name))
+            return self.cache.get_or_compute(key, lambda: method(self, fund_name, *args, **kwargs))
+        return wrapper
+    return decorator
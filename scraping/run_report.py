@@ -0,0 +1,283 @@
+import cProfile
+import contextlib
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+DEFAULT_REPORT_PATH = os.path.join('filling', 'run_report.json')
+# Upper bounds of the HTTP latency histogram buckets; slower requests land in the last, open bucket
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+PROFILE_TOP = 25
+TRACEMALLOC_TOP = 10
+# From 3.12 cProfile runs on sys.monitoring, which allows one profiler per process
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+
+def _bucket_label(index):
+    if index == len(LATENCY_BUCKETS_MS):
+        return f">{LATENCY_BUCKETS_MS[-1]}ms"
+    return f"<={LATENCY_BUCKETS_MS[index]}ms"
+
+
+def _bucket(milliseconds):
+    for index, bound in enumerate(LATENCY_BUCKETS_MS):
+        if milliseconds <= bound:
+            return index
+    return len(LATENCY_BUCKETS_MS)
+
+
+class RunMetrics:
+    """Thread-safe counters, timings and failures for one scraper run
+
+    HTTP requests are counted per host with bytes, status codes and a
+    latency histogram; parses per file with rows, time and errors; any
+    other section of work by name. With an events path, failures and
+    per-fund results are also appended to an NDJSON file as they happen,
+    so an interrupted run still leaves a trail. report() folds it all into
+    one dict for the JSON run report.
+    """
+
+    def __init__(self, events_path=None):
+        self._lock = threading.Lock()
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self.hosts = defaultdict(lambda: {
+            'requests': 0, 'bytes': 0, 'seconds': 0.0, 'max_ms': 0.0,
+            'status': Counter(), 'latency': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+        })
+        self.parse = {'files': 0, 'rows': 0, 'seconds': 0.0, 'failures': 0}
+        self.sections = defaultdict(lambda: {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+        self.failures = Counter()
+        self.extra = {}
+        self._events = None
+        if events_path:
+            self.start_event_log(events_path)
+
+    def start_event_log(self, path):
+        """Append events to an NDJSON file from now on"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._events = open(path, 'a', encoding='utf-8')
+
+    def event(self, kind, **fields):
+        line = json.dumps({'time': datetime.now(timezone.utc).isoformat(), 'event': kind, **fields}, default=str)
+        with self._lock:
+            if self._events is not None:
+                self._events.write(line + '\n')
+                self._events.flush()
+
+    def record_http(self, host, status, nbytes, seconds):
+        """One request attempt; status is the HTTP status code or the exception name"""
+        milliseconds = seconds * 1000
+        with self._lock:
+            stats = self.hosts[host]
+            stats['requests'] += 1
+            stats['bytes'] += nbytes
+            stats['seconds'] += seconds
+            stats['max_ms'] = max(stats['max_ms'], milliseconds)
+            stats['status'][str(status)] += 1
+            stats['latency'][_bucket(milliseconds)] += 1
+
+    def record_parse(self, path, rows, seconds=0.0, error=None):
+        with self._lock:
+            self.parse['files'] += 1
+            self.parse['rows'] += rows
+            self.parse['seconds'] += seconds
+            if error is not None:
+                self.parse['failures'] += 1
+        if error is not None:
+            self.record_failure('parse', path, error)
+
+    def record_failure(self, stage, item, error):
+        with self._lock:
+            self.failures[stage] += 1
+        self.event('failure', stage=stage, item=str(item), error=str(error))
+
+    def add_time(self, section, seconds, count=1):
+        with self._lock:
+            stats = self.sections[section]
+            stats['count'] += count
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+
+    @contextlib.contextmanager
+    def timed(self, section):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(section, time.perf_counter() - start)
+
+    def merge_sections(self, sections):
+        """Add section timings collected in another process"""
+        for section, stats in sections.items():
+            with self._lock:
+                target = self.sections[section]
+                target['count'] += stats['count']
+                target['seconds'] += stats['seconds']
+                target['max_seconds'] = max(target['max_seconds'], stats['max_seconds'])
+
+    def set(self, key, value):
+        """Attach another component's summary (pipeline stages, cache hits, ...) to the report"""
+        with self._lock:
+            self.extra[key] = value
+
+    def report(self):
+        with self._lock:
+            hosts = {}
+            for host, stats in sorted(self.hosts.items()):
+                hosts[host] = {
+                    'requests': stats['requests'],
+                    'bytes': stats['bytes'],
+                    'mean_ms': round(stats['seconds'] * 1000 / stats['requests'], 1) if stats['requests'] else 0.0,
+                    'max_ms': round(stats['max_ms'], 1),
+                    'status': dict(sorted(stats['status'].items())),
+                    'latency': {_bucket_label(i): count for i, count in enumerate(stats['latency']) if count},
+                }
+            parse = dict(self.parse)
+            parse['seconds'] = round(parse['seconds'], 3)
+            parse['rows_per_second'] = round(self.parse['rows'] / self.parse['seconds']) if self.parse['seconds'] else 0
+            sections = {section: {'count': stats['count'], 'seconds': round(stats['seconds'], 3),
+                                  'max_seconds': round(stats['max_seconds'], 3)}
+                        for section, stats in sorted(self.sections.items())}
+            return {
+                'started_at': self.started_at.isoformat(),
+                'elapsed_seconds': round(time.perf_counter() - self._start, 3),
+                'http': hosts,
+                'parse': parse,
+                'sections': sections,
+                'failures': dict(sorted(self.failures.items())),
+                **self.extra,
+            }
+
+    def write_report(self, path=DEFAULT_REPORT_PATH):
+        report = self.report()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{path}.part", 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1, default=str)
+        os.replace(f"{path}.part", path)
+        self.event('report', path=path)
+        return report
+
+    def summary(self):
+        requests = sum(stats['requests'] for stats in self.hosts.values())
+        megabytes = sum(stats['bytes'] for stats in self.hosts.values()) / 2**20
+        rate = self.parse['rows'] / self.parse['seconds'] if self.parse['seconds'] else 0
+        return (f"{requests} HTTP requests ({megabytes:.1f} MiB), {self.parse['files']} files parsed "
+                f"({self.parse['rows']} rows at {rate:,.0f} rows/s), {sum(self.failures.values())} failures")
+
+    def close(self):
+        with self._lock:
+            if self._events is not None:
+                self._events.close()
+                self._events = None
+
+
+_metrics = None
+
+
+def default_metrics():
+    """Metrics shared by every component of the current run"""
+    global _metrics
+    if _metrics is None:
+        _metrics = RunMetrics()
+    return _metrics
+
+
+class RunProfiler:
+    """Optional cProfile and tracemalloc hooks around a run, switched on from the CLI
+
+    cProfile only sees the thread that enables it, so before Python 3.12
+    every thread started after start() (the pipeline's fetchers, dispatcher
+    and writer) gets a profiler of its own, and stop() merges them all into
+    one profile. From 3.12 only one profiler may be active, so only the main
+    thread is profiled. Parser and report worker processes are never
+    profiled; their time is in the run report's parse and section timings.
+    """
+
+    def __init__(self, profile_path=None, trace_memory=False):
+        self.profile_path = profile_path
+        self.trace_memory = trace_memory
+        self._profile = None
+        self._thread_profiles = []
+        self._lock = threading.Lock()
+
+    def _profile_thread(self, *args):
+        # Installed by threading.setprofile, so it runs first thing in each new
+        # thread; enabling the thread's own profiler replaces it
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except Exception as e:
+            # A profiler must never stop the thread it watches
+            sys.setprofile(None)
+            print(f"Not profiling thread {threading.current_thread().name}: {e}")
+            return
+        with self._lock:
+            self._thread_profiles.append(profile)
+
+    def start(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profile_path:
+            self._profile = cProfile.Profile()
+            if PER_THREAD_PROFILES:
+                threading.setprofile(self._profile_thread)
+            else:
+                print("Profiling the main thread only: worker threads cannot be profiled separately on Python 3.12+")
+            self._profile.enable()
+        return self
+
+    def stop(self, metrics=None):
+        """Stop both hooks, print their summaries and attach them to metrics"""
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                # Leave out the profiler's own bookkeeping when both hooks are on
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ])
+            top = snapshot.statistics('lineno')[:TRACEMALLOC_TOP]
+            tracemalloc.stop()
+            print(f"Traced memory: {current / 2**20:.1f} MiB now, {peak / 2**20:.1f} MiB peak")
+            for stat in top:
+                print(f"  {stat}")
+            if metrics is not None:
+                metrics.set('memory', {
+                    'current_mib': round(current / 2**20, 1),
+                    'peak_mib': round(peak / 2**20, 1),
+                    'top': [{'site': str(stat.traceback), 'mib': round(stat.size / 2**20, 2), 'blocks': stat.count}
+                            for stat in top],
+                })
+
+        if self._profile is not None:
+            self._profile.disable()
+            threading.setprofile(None)
+            out = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=out)
+            with self._lock:
+                thread_profiles, self._thread_profiles = self._thread_profiles, []
+            for profile in thread_profiles:
+                try:
+                    stats.add(profile)
+                except TypeError:
+                    # A thread that never made a profiled call has no stats
+                    pass
+            stats.dump_stats(self.profile_path)
+            stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+            print(out.getvalue())
+            print(f"Profile saved to {self.profile_path} (main thread and {len(thread_profiles)} worker threads)")
+            if metrics is not None:
+                metrics.set('profile', self.profile_path)
+            self._profile = None
@@ -0,0 +1,132 @@
+import email.utils
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import RateLimiter
+from run_report import default_metrics
+
+# SEC asks automated clients to identify themselves with a name and contact email
+USER_AGENT = "YourCompany yourname@email.com"  # Replace with your details
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5  # Seconds before the first retry; doubles on every attempt
+MAX_BACKOFF = 60
+PER_HOST_CONCURRENCY = 4
+POOL_SIZE = 10
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def retry_after_seconds(response):
+    """Seconds asked for by a Retry-After header (delta or HTTP date), or None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class SecClient:
+    """Shared HTTP client for every request sent to SEC hosts
+
+    One requests.Session keeps connections alive across requests and
+    threads, with gzip and a single User-Agent. Each request takes a token
+    from the rate limiter and a slot from its host's concurrency limit.
+    429 and 5xx responses and connection errors are retried with
+    exponential backoff; a Retry-After header pauses every request to that
+    host, not just the one that was throttled. Every attempt is recorded
+    in the run metrics with its status, size and latency.
+    """
+
+    def __init__(self, user_agent=USER_AGENT, limiter=None, max_retries=MAX_RETRIES, backoff=BACKOFF_BASE,
+                 per_host=PER_HOST_CONCURRENCY, timeout=REQUEST_TIMEOUT, pool_size=POOL_SIZE, metrics=None):
+        self.limiter = limiter or RateLimiter()
+        self.metrics = metrics or default_metrics()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.per_host = per_host
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'User-Agent': user_agent, 'Accept-Encoding': 'gzip, deflate'})
+
+        self._lock = threading.Lock()
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host))
+        self._paused_until = defaultdict(float)
+        self.retries = 0
+        self.throttled = 0
+
+    def _slot(self, host):
+        with self._lock:
+            return self._host_slots[host]
+
+    def _wait_for_host(self, host):
+        while True:
+            with self._lock:
+                wait = self._paused_until[host] - time.monotonic()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def _backoff(self, host, attempt, response=None):
+        delay = retry_after_seconds(response) if response is not None else None
+        if delay is None:
+            delay = min(MAX_BACKOFF, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+        with self._lock:
+            self.retries += 1
+            if response is not None and response.status_code == 429:
+                self.throttled += 1
+            self._paused_until[host] = max(self._paused_until[host], time.monotonic() + delay)
+
+    def request(self, method, url, headers=None, **kwargs):
+        """Send a request, retrying throttled, failed and unreachable attempts
+
+        The last response is returned as is once retries run out, so callers
+        still decide what a 4xx/5xx means; connection errors are raised.
+        """
+        host = urlsplit(url).netloc
+        kwargs.setdefault('timeout', self.timeout)
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_host(host)
+            with self._slot(host):
+                self.limiter.acquire()
+                start = time.perf_counter()
+                try:
+                    response = self.session.request(method, url, headers=headers, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    self.metrics.record_http(host, type(e).__name__, 0, time.perf_counter() - start)
+                    if attempt == self.max_retries:
+                        raise
+                    self._backoff(host, attempt)
+                    continue
+                self.metrics.record_http(host, response.status_code, len(response.content), time.perf_counter() - start)
+
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            self._backoff(host, attempt, response)
+            response.close()
+
+    def get(self, url, headers=None, **kwargs):
+        return self.request('GET', url, headers=headers, **kwargs)
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        return self.request('POST', url, data=data, headers=headers, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def summary(self):
+        return f"{self.limiter.summary()}, {self.retries} retries ({self.throttled} throttled)"
@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MASTER_PATH = os.path.join('filling', 'security_master.csv')
+MASTER_COLUMNS = ['Security ID', 'CUSIP', 'PUT/CALL', 'TITLE OF CLASS', 'NAME OF ISSUER']
+
+
+def _normalize(values):
+    return pd.Series(values).fillna('').astype(str).str.strip().str.upper().to_numpy()
+
+
+class SecurityMaster:
+    """Interns each security to a compact integer ID
+
+    A security is a CUSIP plus its PUT/CALL flag: the CUSIP already
+    distinguishes issuers and share classes, and options on the same
+    CUSIP are separate positions. Issuer names and titles of class are
+    kept from the first filing that reported the security, so spelling
+    variants across filers map to the same ID. IDs are stable once
+    assigned and the master is saved as a small CSV.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        if path and os.path.exists(path):
+            securities = pd.read_csv(path, dtype=str, keep_default_na=False)
+        else:
+            securities = pd.DataFrame({column: pd.Series(dtype=str) for column in MASTER_COLUMNS})
+        securities['Security ID'] = securities['Security ID'].astype(np.int32)
+        self.securities = securities
+        self._reindex()
+
+    def _reindex(self):
+        self._index = pd.MultiIndex.from_arrays([self.securities['CUSIP'], self.securities['PUT/CALL']])
+
+    def __len__(self):
+        return len(self.securities)
+
+    def assign(self, df):
+        """Return an int32 Security ID for every row of a holdings frame, adding new securities"""
+        cusips = _normalize(df['CUSIP'])
+        put_calls = _normalize(df['PUT/CALL']) if 'PUT/CALL' in df.columns else np.full(len(df), '', dtype=object)
+        keys = pd.MultiIndex.from_arrays([cusips, put_calls])
+
+        positions = self._index.get_indexer(keys)
+        missing = positions < 0
+        if missing.any():
+            rows = np.flatnonzero(missing)
+            new = pd.DataFrame({
+                'CUSIP': cusips[rows],
+                'PUT/CALL': put_calls[rows],
+                'TITLE OF CLASS': df['TITLE OF CLASS'].astype(str).to_numpy()[rows] if 'TITLE OF CLASS' in df.columns else '',
+                'NAME OF ISSUER': df['NAME OF ISSUER'].astype(str).to_numpy()[rows] if 'NAME OF ISSUER' in df.columns else '',
+            }).drop_duplicates(['CUSIP', 'PUT/CALL'])
+            start = int(self.securities['Security ID'].max()) + 1 if len(self.securities) else 0
+            new.insert(0, 'Security ID', np.arange(start, start + len(new), dtype=np.int32))
+            self.securities = pd.concat([self.securities, new[MASTER_COLUMNS]], ignore_index=True)
+            self._reindex()
+            positions = self._index.get_indexer(keys)
+
+        return self.securities['Security ID'].to_numpy()[positions]
+
+    def labels(self):
+        """Display label per Security ID: the issuer name, with the option type if any"""
+        return security_labels(self.securities)
+
+    def save(self, path=None):
+        path = path or self.path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.securities.to_csv(path, index=False)
+
+
+def security_labels(securities):
+    """Label per Security ID from any frame with Security ID, NAME OF ISSUER and PUT/CALL
+
+    The first row of each ID supplies its label.
+    """
+    first = securities.drop_duplicates('Security ID')
+    names = first['NAME OF ISSUER'].astype(str)
+    put_calls = first['PUT/CALL'].fillna('').astype(str).str.upper() if 'PUT/CALL' in first.columns else ''
+    labels = names.where(put_calls == '', names + ' (' + put_calls + ')')
+    return pd.Series(labels.to_numpy(), index=first['Security ID'].to_numpy())
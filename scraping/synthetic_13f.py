@@ -0,0 +1,247 @@
+import os
+import random
+from xml.sax.saxutils import escape
+
+INFO_TABLE_NAMESPACE = 'http://www.sec.gov/edgar/document/thirteenf/informationtable'
+COVER_PAGE_NAMESPACE = 'http://www.sec.gov/edgar/thirteenffiler'
+# Days after the period end that originals and amendments are filed
+FILING_LAG_DAYS = 45
+AMENDMENT_LAG_DAYS = 75
+# Amendments are numbered after the originals within a quarter's accession sequence
+AMENDMENT_SEQUENCE = 500000
+
+ISSUER_WORDS = [
+    'APPLE', 'MICROSOFT', 'AMAZON', 'ALPHABET', 'NVIDIA', 'TESLA', 'META', 'BERKSHIRE',
+    'JPMORGAN', 'VISA', 'EXXON', 'CHEVRON', 'PFIZER', 'MERCK', 'COCA COLA', 'PEPSICO',
+    'WALMART', 'HOME DEPOT', 'INTEL', 'CISCO', 'ORACLE', 'ADOBE', 'NETFLIX', 'SALESFORCE'
+]
+ISSUER_SUFFIXES = ['INC', 'CORP', 'CO', 'HLDGS INC', 'GROUP INC', 'PLC', 'LTD']
+CLASSES = ['COM', 'CL A', 'CL B', 'SHS', 'SPONSORED ADR']
+
+
+def make_security_universe(size, seed=0):
+    """Deterministic list of (issuer, class, cusip) tuples"""
+    rng = random.Random(seed)
+    universe = []
+    for i in range(size):
+        issuer = f"{rng.choice(ISSUER_WORDS)} {rng.choice(ISSUER_SUFFIXES)}"
+        if i >= len(ISSUER_WORDS):
+            issuer = f"{issuer} {i}"
+        cusip = f"{i:06d}{rng.randrange(100):02d}{i % 10}"
+        universe.append((issuer, rng.choice(CLASSES), cusip))
+    return universe
+
+
+def generate_holdings(n_rows, seed=0, option_share=0.05, universe=None):
+    """Yield synthetic holdings as dicts keyed by info-table element name"""
+    rng = random.Random(seed)
+    universe = universe or make_security_universe(max(n_rows, 1), seed)
+    for i in range(n_rows):
+        issuer, title, cusip = universe[i % len(universe)]
+        shares = rng.randrange(100, 5_000_000)
+        put_call = rng.choice(['Put', 'Call']) if rng.random() < option_share else ''
+        sole = rng.randrange(shares + 1)
+        shared = rng.randrange(shares - sole + 1)
+        yield {
+            'nameOfIssuer': issuer,
+            'titleOfClass': title,
+            'cusip': cusip,
+            'value': rng.randrange(1, 2_000_000),
+            'sshPrnamt': shares,
+            'sshPrnamtType': 'SH',
+            'putCall': put_call,
+            'investmentDiscretion': rng.choice(['SOLE', 'DFND', 'OTR']),
+            'otherManager': str(rng.randrange(1, 5)) if rng.random() < 0.2 else '',
+            'Sole': sole,
+            'Shared': shared,
+            'None': shares - sole - shared,
+        }
+
+
+def _info_table_xml(holding):
+    put_call = f"<putCall>{holding['putCall']}</putCall>" if holding['putCall'] else ''
+    other_manager = f"<otherManager>{holding['otherManager']}</otherManager>" if holding['otherManager'] else ''
+    return (
+        "<infoTable>"
+        f"<nameOfIssuer>{escape(holding['nameOfIssuer'])}</nameOfIssuer>"
+        f"<titleOfClass>{escape(holding['titleOfClass'])}</titleOfClass>"
+        f"<cusip>{holding['cusip']}</cusip>"
+        f"<value>{holding['value']}</value>"
+        f"<shrsOrPrnAmt><sshPrnamt>{holding['sshPrnamt']}</sshPrnamt>"
+        f"<sshPrnamtType>{holding['sshPrnamtType']}</sshPrnamtType></shrsOrPrnAmt>"
+        f"{put_call}"
+        f"<investmentDiscretion>{holding['investmentDiscretion']}</investmentDiscretion>"
+        f"{other_manager}"
+        f"<votingAuthority><Sole>{holding['Sole']}</Sole><Shared>{holding['Shared']}</Shared>"
+        f"<None>{holding['None']}</None></votingAuthority>"
+        "</infoTable>\n"
+    )
+
+
+def write_info_table(path, n_rows, seed=0, option_share=0.05, universe=None):
+    """Write a namespaced information table XML file with n_rows entries"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<informationTable xmlns="{INFO_TABLE_NAMESPACE}">\n')
+        for holding in generate_holdings(n_rows, seed, option_share, universe):
+            f.write(_info_table_xml(holding))
+        f.write('</informationTable>\n')
+    return path
+
+
+def generate_holdings_frame(n_funds, n_quarters, positions, seed=0, option_share=0.05, first_quarter='2018-03-31',
+                            amendment_share=0.0):
+    """Holdings DataFrame shaped like the scraper output for several funds and quarters
+
+    Each fund draws its positions from a shared security universe and keeps
+    most of them from one quarter to the next, like a real portfolio. A
+    share of the fund-quarters is amended: half by a RESTATEMENT that
+    replaces the original, half by a NEW HOLDINGS amendment that adds a few
+    positions. The frame is what reconciliation leaves, so restated
+    originals do not appear in it; write_filing_tree writes them back.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    # A separate stream, so amendment_share does not change the holdings themselves
+    amendment_rng = np.random.default_rng(seed + 1)
+    universe = make_security_universe(max(positions * 4, 100), seed)
+    period_ends = pd.date_range(first_quarter, periods=n_quarters, freq='QE')
+    quarters = period_ends.strftime('%Y-%m-%d')
+    filed = (period_ends + pd.Timedelta(days=FILING_LAG_DAYS)).strftime('%Y-%m-%d')
+    amended = (period_ends + pd.Timedelta(days=AMENDMENT_LAG_DAYS)).strftime('%Y-%m-%d')
+
+    def holdings(securities, n, filing_number, report_date, filing_date, form, amendment):
+        shares = rng.integers(100, 5_000_000, n)
+        sole = (shares * rng.random(n)).astype(np.int64)
+        return pd.DataFrame({
+            'NAME OF ISSUER': [name for name, _, _ in securities],
+            'TITLE OF CLASS': [title for _, title, _ in securities],
+            'CUSIP': [cusip for _, _, cusip in securities],
+            'VALUE (x$1000)': rng.integers(1, 2_000_000, n).astype(float),
+            'SHRS OR PRN AMT': shares.astype(float),
+            'SH/PRN': 'SH',
+            'PUT/CALL': np.where(rng.random(n) < option_share, rng.choice(['Put', 'Call'], n), ''),
+            'INVESTMENT DISCRETION': 'SOLE',
+            'OTHER MANAGER': '',
+            'VOTING AUTHORITY SOLE': sole,
+            'VOTING AUTHORITY SHARED': 0,
+            'VOTING AUTHORITY NONE': shares - sole,
+            'Filing Number': filing_number,
+            'Filing Date': filing_date,
+            'Report Date': report_date,
+            'Form': form,
+            'Amendment Type': amendment,
+        })
+
+    frames = []
+    for fund in range(n_funds):
+        cik = f"{fund + 1:010d}"
+        held = rng.choice(len(universe), positions, replace=False)
+        for q, report_date in enumerate(quarters):
+            # Replace roughly a fifth of the book each quarter
+            churn = rng.random(positions) < 0.2
+            held[churn] = rng.choice(len(universe), churn.sum())
+            securities = [universe[i] for i in held]
+            original = f"filing_{cik}-{q:02d}-{q:06d}"
+            amendment = f"filing_{cik}-{q:02d}-{AMENDMENT_SEQUENCE + q:06d}"
+            kind = ''
+            if amendment_rng.random() < amendment_share:
+                kind = 'RESTATEMENT' if amendment_rng.random() < 0.5 else 'NEW HOLDINGS'
+
+            if kind == 'RESTATEMENT':
+                frames.append(holdings(securities, positions, amendment, report_date, amended[q], '13F-HR/A', kind))
+            else:
+                frames.append(holdings(securities, positions, original, report_date, filed[q], '13F-HR', ''))
+            if kind == 'NEW HOLDINGS':
+                added = max(1, positions // 20)
+                extra = [universe[i] for i in amendment_rng.choice(len(universe), added)]
+                frames.append(holdings(extra, added, amendment, report_date, amended[q], '13F-HR/A', kind))
+    df = pd.concat(frames, ignore_index=True)
+    df['CIK'] = df['Filing Number'].str[len('filing_'):len('filing_') + 10]
+    df['Fund Name'] = 'Synthetic Fund ' + df['CIK'].str[-4:]
+    return df
+
+
+def _cover_page_xml(form, report_date, amendment_type=''):
+    """Minimal primary_doc.xml with the cover page fields the scraper reads"""
+    year, month, day = report_date.split('-')
+    amendment = ''
+    if amendment_type:
+        amendment = (f"<isAmendment>true</isAmendment><amendmentNo>1</amendmentNo>"
+                     f"<amendmentInfo><amendmentType>{amendment_type}</amendmentType></amendmentInfo>")
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n<edgarSubmission xmlns="{COVER_PAGE_NAMESPACE}">'
+        f"<headerData><submissionType>{form}</submissionType></headerData>"
+        f"<formData><coverPage><reportCalendarOrQuarter>{month}-{day}-{year}</reportCalendarOrQuarter>"
+        f"{amendment}</coverPage></formData></edgarSubmission>\n"
+    )
+
+
+def _filing_xml(rows):
+    """Information table XML for the rows of one filing from generate_holdings_frame"""
+    from info_table_parser import FIELDS
+
+    columns = {element: rows[column].tolist() for element, (column, kind) in FIELDS.items()}
+    parts = [f'<?xml version="1.0" encoding="UTF-8"?>\n<informationTable xmlns="{INFO_TABLE_NAMESPACE}">\n']
+    for i in range(len(rows)):
+        holding = {element: values[i] for element, values in columns.items()}
+        holding['value'] = int(holding['value'])
+        holding['sshPrnamt'] = int(holding['sshPrnamt'])
+        parts.append(_info_table_xml(holding))
+    parts.append('</informationTable>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+def write_filing_tree(base_dir, df, archive=None):
+    """Write generate_holdings_frame output as downloaded filings under base_dir/fund_<cik>
+
+    Every filing gets its information table, a cover page and a row in the
+    fund's filing metadata, as download_form13f_files would leave them, so
+    scraping the tree reproduces df. Restated quarters also get the
+    original filing the restatement replaces. With an archive, documents
+    go into it instead of filing directories. Returns the number of filings.
+    """
+    import pandas as pd
+
+    from amendments import COVER_PAGE_FILE
+    from filing_archive import INFO_TABLE_NAME
+    from form13f_scraper import FILING_METADATA_COLUMNS, FILING_METADATA_FILE
+
+    def save(fund_dir, cik, accession, name, content):
+        if archive is not None:
+            archive.put(cik, accession, name, content)
+            return
+        filing_dir = os.path.join(fund_dir, f"filing_{accession}")
+        os.makedirs(filing_dir, exist_ok=True)
+        with open(os.path.join(filing_dir, name), 'wb') as f:
+            f.write(content)
+
+    written = 0
+    for cik, fund in df.groupby('CIK', sort=True):
+        fund_dir = os.path.join(base_dir, f"fund_{cik}")
+        os.makedirs(fund_dir, exist_ok=True)
+        metadata = []
+        for filing_number, rows in fund.groupby('Filing Number', sort=True):
+            accession = filing_number.replace('filing_', '', 1)
+            form, kind = rows['Form'].iloc[0], rows['Amendment Type'].iloc[0]
+            report_date = rows['Report Date'].iloc[0]
+            filings = [(accession, form, rows['Filing Date'].iloc[0], kind)]
+            if kind == 'RESTATEMENT':
+                # The original the restatement replaces, filed on the usual schedule
+                q = int(accession.split('-')[1])
+                original_date = (pd.Timestamp(report_date) + pd.Timedelta(days=FILING_LAG_DAYS)).strftime('%Y-%m-%d')
+                filings.append((f"{cik}-{q:02d}-{q:06d}", '13F-HR', original_date, ''))
+
+            info_table = _filing_xml(rows)
+            for number, filing_form, filing_date, filing_kind in filings:
+                save(fund_dir, cik, number, INFO_TABLE_NAME, info_table)
+                save(fund_dir, cik, number, COVER_PAGE_FILE,
+                     _cover_page_xml(filing_form, report_date, filing_kind).encode('utf-8'))
+                metadata.append((number, filing_form, filing_date, report_date, COVER_PAGE_FILE))
+                written += 1
+        pd.DataFrame(metadata, columns=FILING_METADATA_COLUMNS).to_csv(os.path.join(fund_dir, FILING_METADATA_FILE), index=False)
+    return written
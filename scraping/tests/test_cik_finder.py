@@ -0,0 +1,8 @@
+from cik_finder import normalize_name
+
+
+def test_only_trailing_legal_suffixes_are_dropped():
+    assert normalize_name('Bridgewater Associates, LP') == 'BRIDGEWATER ASSOCIATES'
+    assert normalize_name('Foo Holdings Co., Ltd.') == 'FOO HOLDINGS'
+    assert normalize_name('CO Investment Partners') == 'CO INVESTMENT PARTNERS'
+    assert normalize_name('Banco SA Capital') == 'BANCO SA CAPITAL'
@@ -0,0 +1,26 @@
+import os
+
+import pandas as pd
+
+from form13f_scraper import FILING_METADATA_FILE, parse_filing_tree
+from synthetic_13f import generate_holdings_frame, write_filing_tree
+
+
+def test_report_dates_from_cover_pages(tmp_path):
+    """Filings listed from the full index have no reportDate; the cover page supplies it"""
+    # Seed 1 has both RESTATEMENT and NEW HOLDINGS amendments
+    df = generate_holdings_frame(2, 3, 20, seed=1, amendment_share=0.5)
+    base_dir = str(tmp_path / 'filling')
+    write_filing_tree(base_dir, df)
+    for name in os.listdir(base_dir):
+        path = os.path.join(base_dir, name, FILING_METADATA_FILE)
+        pd.read_csv(path, dtype=str).drop(columns=['reportDate']).to_csv(path, index=False)
+
+    parsed = pd.concat(parse_filing_tree(base_dir, workers=1).values(), ignore_index=True)
+
+    assert parsed['Report Date'].notna().all()
+    # Restated originals are matched to their period and dropped, not counted twice
+    assert len(parsed) == len(df)
+    expected = df.drop_duplicates('Filing Number').set_index('Filing Number')['Report Date'].astype(str)
+    got = parsed.drop_duplicates('Filing Number').set_index('Filing Number')['Report Date'].astype(str)
+    assert got.sort_index().equals(expected.sort_index())
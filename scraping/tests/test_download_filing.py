@@ -0,0 +1,37 @@
+import requests
+
+from form13f_scraper import download_filing
+from manifest import FilingManifest
+
+INFO_TABLE_URL = 'https://www.sec.gov/Archives/edgar/data/1/000000000124000001/infotable.xml'
+
+
+def response(status, content=b''):
+    r = requests.Response()
+    r.status_code = status
+    r._content = content
+    return r
+
+
+class FakeClient:
+    """Serves the information table; the cover page returns cover_status"""
+
+    def __init__(self, cover_status):
+        self.cover_status = cover_status
+
+    def get(self, url, headers=None):
+        if url == INFO_TABLE_URL:
+            return response(200, b'<informationTable/>')
+        return response(self.cover_status)
+
+
+def test_filing_without_cover_page_stays_pending(tmp_path):
+    manifest = FilingManifest(str(tmp_path / 'manifest.sqlite'))
+    filing = {'accessionNumber': '0000000001-24-000001'}
+    url_cache = {filing['accessionNumber']: INFO_TABLE_URL}
+
+    assert download_filing('0000000001', filing, str(tmp_path), FakeClient(503), url_cache, manifest)
+    assert manifest.pending('0000000001', [filing['accessionNumber']]) == [filing['accessionNumber']]
+
+    assert download_filing('0000000001', filing, str(tmp_path), FakeClient(200), url_cache, manifest)
+    assert manifest.pending('0000000001', [filing['accessionNumber']]) == []
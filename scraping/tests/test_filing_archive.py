@@ -0,0 +1,22 @@
+import os
+
+from filing_archive import FilingArchive
+from form13f_scraper import pending_filings
+from manifest import FilingManifest
+from synthetic_13f import generate_holdings_frame, write_filing_tree
+
+
+def test_imported_filings_count_as_stored(tmp_path):
+    df = generate_holdings_frame(1, 3, 10)
+    base_dir = str(tmp_path / 'filling')
+    write_filing_tree(base_dir, df)
+    archive = FilingArchive(str(tmp_path / 'archive.sqlite'))
+    manifest = FilingManifest(str(tmp_path / 'manifest.sqlite'))
+
+    assert archive.import_tree(base_dir, manifest=manifest) == 6
+
+    cik = df['CIK'].iloc[0]
+    filings = [{'accessionNumber': name.replace('filing_', '', 1)}
+               for name in os.listdir(os.path.join(base_dir, f"fund_{cik}")) if name.startswith('filing_')]
+    assert len(filings) == 3
+    assert pending_filings(cik, filings, manifest, archive) == []
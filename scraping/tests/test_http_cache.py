@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+import requests
+
+from http_cache import HttpCache
+
+URL = 'https://data.sec.gov/submissions/CIK0000000001.json'
+
+
+def response(status, content=b'', headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r._content = content
+    r.headers.update(headers or {})
+    return r
+
+
+def test_offline_mode_serves_cached_snapshots(tmp_path):
+    HttpCache(str(tmp_path), ttl=0).store(URL, b'{"cik": 1}', etag='"v1"')
+
+    def no_network(headers):
+        raise AssertionError("offline cache must not fetch")
+
+    offline = HttpCache(str(tmp_path), ttl=0, offline=True)
+    assert offline.get_json(URL, no_network) == {'cik': 1}
+    with pytest.raises(LookupError):
+        offline.get(URL.replace('1.json', '2.json'), no_network)
+
+
+def test_stale_entries_are_revalidated_with_their_etag(tmp_path):
+    cache = HttpCache(str(tmp_path), ttl=0)
+    cache.store(URL, b'{"cik": 1}', etag='"v1"')
+    sent = []
+
+    def not_modified(headers):
+        sent.append(headers)
+        return response(304)
+
+    assert cache.get(URL, not_modified) == b'{"cik": 1}'
+    assert sent == [{'If-None-Match': '"v1"'}]
+
+    changed = cache.get(URL, lambda headers: response(200, b'{"cik": 2}', {'ETag': '"v2"'}))
+    assert changed == b'{"cik": 2}'
+    assert cache.load(URL)[1]['etag'] == '"v2"'
+    assert cache.stats() == {'hits': 0, 'revalidated': 1, 'misses': 1}
+
+
+def test_concurrent_stores_of_one_url(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    bodies = [bytes([i]) * 100_000 for i in range(8)]
+    threads = [threading.Thread(target=cache.store, args=(URL, body)) for body in bodies]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.load(URL)[0] in bodies
+    assert not [name for name in tmp_path.iterdir() if name.suffix == '.part']
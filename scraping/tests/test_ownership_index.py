@@ -0,0 +1,20 @@
+import pandas as pd
+
+from ownership_index import OwnershipIndex
+
+
+def test_options_are_not_holdings():
+    df = pd.DataFrame({
+        'CUSIP': ['037833100', '037833100', '037833100'],
+        'Fund Name': ['Equity Fund', 'Equity Fund', 'Put Fund'],
+        'Report Date': ['2023-12-31'] * 3,
+        'PUT/CALL': ['', 'Call', 'Put'],
+        'SHRS OR PRN AMT': [100, 5000, 8000],
+        'VALUE (x$1000)': [10.0, 500.0, 800.0],
+    })
+    index = OwnershipIndex.build(df)
+
+    holders = index.holders('037833100')
+    assert holders['Fund Name'].tolist() == ['Equity Fund']
+    assert holders['shares'].tolist() == [100]
+    assert index.crowding_score('037833100') == 1.0
@@ -0,0 +1,31 @@
+import os
+
+import pandas as pd
+
+import pipeline
+from pipeline import FilingPipeline
+from synthetic_13f import generate_holdings_frame, write_filing_tree
+
+
+def parse_or_die(archive_path, task):
+    if 'filing_0000000001-01-000001' in str(task):
+        os._exit(1)
+    return pipeline.parse_file(task)
+
+
+def test_dead_parser_process_does_not_hang_the_run(tmp_path, monkeypatch):
+    df = generate_holdings_frame(2, 3, 10)
+    base_dir = str(tmp_path / 'filling')
+    write_filing_tree(base_dir, df)
+    ciks = sorted(df['CIK'].unique())
+    assert any('0000000001-01-000001' in name for name in os.listdir(os.path.join(base_dir, f"fund_{ciks[0]}")))
+
+    monkeypatch.setattr(pipeline, '_parse', parse_or_die)
+    written = {}
+    no_new_filings = pd.DataFrame(columns=['form', 'accessionNumber'])
+    run = FilingPipeline(base_dir, client=object(), parse_workers=1, queue_size=2,
+                         on_fund=lambda holdings_df, fund_dir, fund_name, cik: written.update({cik: holdings_df}))
+    run.run({f"Fund {cik}": cik for cik in ciks}, filings_by_cik={cik: no_new_filings for cik in ciks})
+
+    assert sorted(written) == ciks
+    assert run.stages['parse'].items == 6
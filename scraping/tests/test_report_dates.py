@@ -0,0 +1,73 @@
+import pandas as pd
+
+from analysis import HedgeFundAnalyzer
+from holdings_store import normalize_dtypes, parse_dates, read_holdings, write_holdings
+
+
+def holdings(rows=60):
+    """A fund's holdings with categorical Report Date, as attach_filing_dates writes them"""
+    dates = ['2023-03-31', '2023-06-30']
+    return pd.DataFrame({
+        'NAME OF ISSUER': [f"ISSUER {i % 10}" for i in range(rows)],
+        'TITLE OF CLASS': 'COM',
+        'CUSIP': [f"{i % 10:09d}" for i in range(rows)],
+        'VALUE (x$1000)': 100.0,
+        'SHRS OR PRN AMT': 10,
+        'SH/PRN': 'SH',
+        'PUT/CALL': '',
+        'INVESTMENT DISCRETION': 'SOLE',
+        'OTHER MANAGER': '',
+        'VOTING AUTHORITY SOLE': 10,
+        'VOTING AUTHORITY SHARED': 0,
+        'VOTING AUTHORITY NONE': 0,
+        'Filing Number': [f"filing_{i % 2}" for i in range(rows)],
+        'Fund Name': 'Test Fund',
+        'Filing Date': pd.Categorical([dates[i % 2] for i in range(rows)]),
+        'Report Date': pd.Categorical([dates[i % 2] for i in range(rows)]),
+    })
+
+
+def test_parse_dates_of_long_categorical():
+    dates = parse_dates(holdings()['Report Date'])
+    assert dates.dtype.kind == 'M'
+    assert dates.min() == pd.Timestamp('2023-03-31')
+
+
+def test_analyzer_summary_with_categorical_report_dates():
+    summary = HedgeFundAnalyzer(holdings()).generate_fund_summary('Test Fund')
+    assert summary['date_range'] == '2023-03-31 to 2023-06-30'
+
+
+def test_store_keeps_dates_as_datetimes(tmp_path):
+    assert normalize_dtypes(holdings())['Report Date'].dtype.kind == 'M'
+    write_holdings(holdings(), '1', str(tmp_path))
+    stored = read_holdings(str(tmp_path))
+    assert stored['Report Date'].dtype.kind == 'M'
+    assert stored['Filing Date'].dtype.kind == 'M'
+    assert sorted(stored['Quarter'].astype(str).unique()) == ['2023Q1', '2023Q2']
+
+
+def test_rewrite_drops_quarters_a_fund_left(tmp_path):
+    undated = holdings().assign(**{'Report Date': None, 'Filing Date': None})
+    write_holdings(undated, '1', str(tmp_path))
+    write_holdings(holdings(), '1', str(tmp_path))
+
+    stored = read_holdings(str(tmp_path))
+    assert len(stored) == len(holdings())
+    assert 'unknown' not in set(stored['Quarter'].astype(str))
+
+
+def test_missing_report_dates_fall_back_to_accession_years():
+    df = holdings().assign(**{
+        'Report Date': pd.NaT,
+        'Filing Number': [f"filing_0000919574-{22 + i % 2}-000001" for i in range(60)],
+    })
+    summary = HedgeFundAnalyzer(df).generate_fund_summary('Test Fund')
+    assert summary['date_range'] == '2022-01-01 to 2023-01-01'
+
+
+def test_report_without_any_dates():
+    analyzer = HedgeFundAnalyzer(holdings().assign(**{'Report Date': pd.NaT}))
+    assert analyzer.generate_fund_summary('Test Fund')['date_range'] == 'unknown'
+    assert analyzer.calculate_turnover('Test Fund').empty
+    assert 'unknown' in analyzer.generate_html_report('Test Fund')
@@ -0,0 +1,25 @@
+import os
+import time
+
+from result_cache import ResultCache
+
+
+def test_disk_entries_are_versioned(tmp_path):
+    ResultCache(disk_dir=str(tmp_path), version=1).put('key', 'old result')
+
+    assert ResultCache(disk_dir=str(tmp_path), version=1).get('key') == 'old result'
+    assert ResultCache(disk_dir=str(tmp_path), version=2).get('key') is None
+
+
+def test_prune_removes_other_versions_and_unused_entries(tmp_path):
+    ResultCache(disk_dir=str(tmp_path), version=1).put('key', 'old result')
+    cache = ResultCache(disk_dir=str(tmp_path), version=2, max_age_days=1)
+    cache.put('fresh', 1)
+    cache.put('stale', 2)
+    stale = cache._disk_path('stale')
+    os.utime(stale, (time.time() - 2 * 86400,) * 2)
+
+    assert cache.prune() == 2
+    assert os.listdir(tmp_path) == [os.path.basename(cache.disk_dir)]
+    assert not os.path.exists(stale)
+    assert ResultCache(disk_dir=str(tmp_path), version=2).get('fresh') == 1
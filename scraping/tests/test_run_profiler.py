@@ -0,0 +1,42 @@
+import cProfile
+import contextlib
+import io
+import pstats
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import run_report
+from run_report import RunProfiler
+
+
+def squares(n):
+    return sum(i * i for i in range(n))
+
+
+def profiled_job(path):
+    profiler = RunProfiler(str(path)).start()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(squares, [1000] * 6))
+    with contextlib.redirect_stdout(io.StringIO()):
+        profiler.stop()
+    return results
+
+
+def test_threaded_job_runs_under_the_profiler(tmp_path):
+    path = tmp_path / 'run.prof'
+    assert profiled_job(path) == [squares(1000)] * 6
+    calls = {func[2]: stats[1] for func, stats in pstats.Stats(str(path)).stats.items()}
+    if run_report.PER_THREAD_PROFILES:
+        assert calls.get('squares') == 6
+
+
+def test_profiler_failure_does_not_stop_threads(tmp_path, monkeypatch):
+    class MainThreadOnly(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            if threading.current_thread() is not threading.main_thread():
+                raise ValueError("Another profiling tool is already active")
+            return super().enable(*args, **kwargs)
+
+    monkeypatch.setattr(run_report.cProfile, 'Profile', MainThreadOnly)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert profiled_job(tmp_path / 'run.prof') == [squares(1000)] * 6
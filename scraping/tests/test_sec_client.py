@@ -0,0 +1,66 @@
+import time
+
+import requests
+
+from rate_limiter import RateLimiter
+from run_report import RunMetrics
+from sec_client import SecClient, retry_after_seconds
+
+URL = 'https://www.sec.gov/Archives/edgar/data/1/index.json'
+
+
+def response(status, headers=None, content=b'{}'):
+    r = requests.Response()
+    r.status_code = status
+    r.headers.update(headers or {})
+    r._content = content
+    return r
+
+
+class FakeSession:
+    """Replays responses (or raises exceptions) in order and records when each request was sent"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.sent = []
+
+    def request(self, method, url, headers=None, **kwargs):
+        self.sent.append(time.monotonic())
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def client(session, **kwargs):
+    sec = SecClient(limiter=RateLimiter(rate=1000, burst=10), backoff=0.01, metrics=RunMetrics(), **kwargs)
+    sec.session = session
+    return sec
+
+
+def test_retries_server_errors_and_connection_errors():
+    session = FakeSession(response(503), requests.exceptions.ConnectionError('reset'), response(200))
+    sec = client(session)
+    assert sec.get(URL).status_code == 200
+    assert len(session.sent) == 3
+    assert sec.retries == 2
+    assert sec.metrics.hosts['www.sec.gov']['status'] == {'503': 1, 'ConnectionError': 1, '200': 1}
+
+
+def test_retry_after_pauses_the_host():
+    session = FakeSession(response(429, {'Retry-After': '1'}), response(200))
+    sec = client(session)
+    assert sec.get(URL).status_code == 200
+    assert session.sent[1] - session.sent[0] >= 0.9
+    assert sec.throttled == 1
+
+
+def test_last_response_is_returned_once_retries_run_out():
+    sec = client(FakeSession(response(500), response(500)), max_retries=1)
+    assert sec.get(URL).status_code == 500
+
+
+def test_retry_after_http_date():
+    assert retry_after_seconds(response(429, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})) == 0.0
+    assert retry_after_seconds(response(429, {'Retry-After': '7'})) == 7.0
+    assert retry_after_seconds(response(429)) is None